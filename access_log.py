@@ -0,0 +1,133 @@
+"""
+Buffered, asynchronous access log
+Handler threads only put a record on a bounded queue; a background thread
+formats records as JSON lines, writes them in batches and rotates the file by
+size. When the queue is full records are dropped and counted instead of
+blocking the request.
+"""
+
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_STOP = object()
+
+
+class AccessLogWriter:
+    """Background writer for structured access log records"""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, queue_size=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, echo=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.echo = echo
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._file = None
+
+    def log(self, record):
+        """Queue a record (a JSON-serialisable dict) without ever blocking"""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """Flush queued records and stop the writer thread"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        reported_drops = 0
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                batch = [record for record in batch if record is not _STOP]
+                running = False
+
+            if self.dropped != reported_drops:
+                batch.append({"ts": time.time(), "event": "dropped", "count": self.dropped - reported_drops})
+                reported_drops = self.dropped
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    print(f"❌ Access log write failed: {e}", file=sys.stderr)
+
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, batch):
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch)
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        if self._file.tell() + len(data) > self.max_bytes and self._file.tell() > 0:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        if self.echo:
+            sys.stdout.write("".join(format_console(record) + "\n" for record in batch))
+            sys.stdout.flush()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+
+def format_console(record):
+    """One-line console rendering of a record, like the old per-request print"""
+    if "status" in record:
+        return (f"📄 {record['remote']} - \"{record['method']} {record['path']} {record['protocol']}\" "
+                f"{record['status']} {record['bytes']} {record['duration_ms']:.1f}ms")
+    if record.get("event") == "dropped":
+        return f"⚠️  Access log dropped {record['count']} records"
+    return f"📄 {record.get('remote', '-')} - {record.get('message', '')}"
@@ -310,8 +310,8 @@ def interactive_converter():
         # Use local converter
         from screenshot_to_html import ScreenshotToHTML
         screenshot_path = input("Enter screenshot path: ")
-        converter = ScreenshotToHTML(screenshot_path)
-        converter.convert_to_html()
+        with ScreenshotToHTML(screenshot_path) as converter:
+            converter.convert_to_html()
         return
     
     print("\nConversion Options:")
@@ -0,0 +1,135 @@
+"""
+On-disk cache for screenshot analysis results
+Palette and layout results are stored as small JSON files keyed by the
+screenshot's content hash plus the stage's parameters, so converting the same
+PNG again skips the analysis. CACHE_VERSION is part of every file name: bump it
+when an algorithm changes and old entries stop matching and are evicted first.
+The directory is capped in size, least recently used entries go first. Only
+files named like cache entries are ever listed or removed
+"""
+
+import hashlib
+import json
+import os
+import re
+
+CACHE_VERSION = 3
+DEFAULT_CACHE_DIR = ".analysis_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+ENTRY_NAME = re.compile(r"v\d+-[0-9a-f]{64}\.json")  # anything else isn't ours, including *.tmp in flight
+# The directory is rescanned on a process's first put, then once it has written
+# this share of max_bytes, so it can overshoot by that much per writing process
+EVICT_FRACTION = 1 / 16
+
+# cache directory -> bytes this process has written there since it last evicted
+_unscanned_bytes = {}
+
+
+def file_digest(path):
+    """sha256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Size-capped LRU of JSON results in a directory, keyed by content hash and parameters
+
+    Recency is the file's mtime, refreshed on every hit, so several processes
+    (batch_convert workers) can share one directory without an index file.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, version=CACHE_VERSION):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.prefix = f"v{version}-"
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, image_hash, stage, params):
+        """Cache key for one stage's result on one image"""
+        payload = json.dumps({"image": image_hash, "stage": stage, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{self.prefix}{key}.json")
+
+    def get(self, key):
+        """Stored result for key, or None"""
+        path = self.path_for(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        data = json.dumps(result)
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        directory = os.path.abspath(self.cache_dir)
+        written = _unscanned_bytes.get(directory)
+        if written is None or written + len(data) > self.max_bytes * EVICT_FRACTION:
+            self.evict()
+            _unscanned_bytes[directory] = 0
+        else:
+            _unscanned_bytes[directory] = written + len(data)
+
+    def cached(self, image_hash, stage, params, compute):
+        """Result of compute() for this image and stage, computed only on a miss"""
+        key = self.key(image_hash, stage, params)
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def entries(self):
+        """(path, size, last used) for every cache entry in the directory, of any version"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not ENTRY_NAME.fullmatch(entry.name):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue  # removed by another process meanwhile
+            entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def evict(self):
+        """Drop entries from older cache versions, then least recently used ones over max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        # stale versions sort first, then oldest use first
+        entries.sort(key=lambda e: (os.path.basename(e[0]).startswith(self.prefix), e[2]))
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
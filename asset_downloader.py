@@ -0,0 +1,262 @@
+"""
+Concurrent asset downloader
+Finds the images, stylesheets, fonts and scripts a page uses (img/srcset,
+link, script, inline styles and url()/@import inside CSS) and downloads them
+in parallel over a pooled requests.Session. Files are streamed to disk and
+named by content hash, so an asset referenced from several URLs is stored once
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+DEFAULT_WORKERS = 8
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+MAX_ASSET_BYTES = 50 * 1024 * 1024
+HASH_LENGTH = 16
+MANIFEST_NAME = "manifest.json"
+
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)(.*?)\1\s*\)|@import\s+(['"])(.*?)\3""", re.IGNORECASE)
+LINK_RELS = {"stylesheet", "icon", "shortcut", "apple-touch-icon", "preload", "prefetch", "manifest"}
+FONT_EXTENSIONS = {".woff", ".woff2", ".ttf", ".otf", ".eot"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico", ".bmp"}
+
+
+def css_urls(css, base_url):
+    """Absolute URLs referenced by url() and @import in a stylesheet"""
+    urls = []
+    for match in CSS_URL_PATTERN.finditer(css):
+        ref = (match.group(2) or match.group(4) or "").strip()
+        if ref:
+            urls.append(urljoin(base_url, ref))
+    return urls
+
+
+def srcset_urls(srcset, base_url):
+    """URLs in a srcset attribute ("a.png 1x, b.png 2x")"""
+    urls = []
+    for candidate in srcset.split(","):
+        parts = candidate.split()
+        if parts:
+            urls.append(urljoin(base_url, parts[0]))
+    return urls
+
+
+def discover_assets(html, base_url):
+    """Absolute asset URLs referenced by an HTML page, in document order"""
+    soup = BeautifulSoup(html, "html.parser")
+    base = soup.find("base", href=True)
+    if base:
+        base_url = urljoin(base_url, base["href"])
+
+    urls = []
+    for tag in soup.find_all(["img", "source", "video", "audio", "input", "script", "link", "style"]):
+        if tag.name == "link":
+            rels = {rel.lower() for rel in tag.get("rel", [])}
+            if rels & LINK_RELS and tag.get("href"):
+                urls.append(urljoin(base_url, tag["href"]))
+        elif tag.name == "style":
+            urls.extend(css_urls(tag.get_text(), base_url))
+        else:
+            for attr in ("src", "poster"):
+                if tag.get(attr):
+                    urls.append(urljoin(base_url, tag[attr]))
+            if tag.get("srcset"):
+                urls.extend(srcset_urls(tag["srcset"], base_url))
+
+    for tag in soup.find_all(style=True):
+        urls.extend(css_urls(tag["style"], base_url))
+
+    return unique_http_urls(urls)
+
+
+def unique_http_urls(urls):
+    """Drop fragments, data:/blob: URIs and repeats, keeping order"""
+    seen = {}
+    for url in urls:
+        url = urldefrag(url)[0]
+        if urlparse(url).scheme in ("http", "https"):
+            seen.setdefault(url, None)
+    return list(seen)
+
+
+def asset_kind(url, content_type=""):
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    if "css" in content_type or ext == ".css":
+        return "stylesheet"
+    if "font" in content_type or ext in FONT_EXTENSIONS:
+        return "font"
+    if "javascript" in content_type or ext in (".js", ".mjs"):
+        return "script"
+    if content_type.startswith("image/") or ext in IMAGE_EXTENSIONS:
+        return "image"
+    return "other"
+
+
+def file_extension(url, content_type):
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    if ext and len(ext) <= 6:
+        return ext
+    return mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+
+
+class AssetDownloader:
+    """Download every asset of page_url into assets_dir with bounded parallelism"""
+
+    def __init__(self, page_url, assets_dir, workers=DEFAULT_WORKERS,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), session=None, incremental=False):
+        self.page_url = page_url
+        self.assets_dir = assets_dir
+        self.workers = workers
+        self.timeout = timeout
+        self.session = session or self.create_session(workers)
+        self.results = {}
+        self._lock = threading.Lock()
+        os.makedirs(assets_dir, exist_ok=True)
+        # with incremental, the previous run's validators make requests conditional
+        self.previous = self.load_manifest() if incremental else {}
+
+    @staticmethod
+    def create_session(workers=DEFAULT_WORKERS):
+        """Session whose connection pool is big enough for every worker"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = "Mozilla/5.0 (compatible; screenshot-capture)"
+        return session
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since from the last run, if its file is still there"""
+        previous = self.previous.get(url)
+        if not previous or "file" not in previous or \
+                not os.path.exists(os.path.join(self.assets_dir, previous["file"])):
+            return {}
+        headers = {}
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+        return headers
+
+    def fetch(self, url):
+        """Stream one asset to disk; returns its result entry"""
+        headers = self.conditional_headers(url)
+        with self.session.get(url, stream=True, timeout=self.timeout, headers=headers) as response:
+            if response.status_code == 304 and headers:
+                # nothing came over the wire; the stored file is reused as is
+                return dict(self.previous[url], status="unchanged", transferred=0)
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            digest = hashlib.sha256()
+            size = 0
+            fd, tmp_path = tempfile.mkstemp(dir=self.assets_dir, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > MAX_ASSET_BYTES:
+                            raise ValueError(f"larger than {MAX_ASSET_BYTES} bytes")
+                        digest.update(chunk)
+                        f.write(chunk)
+                name = digest.hexdigest()[:HASH_LENGTH] + file_extension(response.url, content_type)
+                path = os.path.join(self.assets_dir, name)
+                with self._lock:
+                    duplicate = os.path.exists(path)
+                    if duplicate:
+                        os.remove(tmp_path)
+                    else:
+                        os.replace(tmp_path, path)
+            except:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        if self.previous.get(url, {}).get("file") == name:
+            status = "unchanged"
+        else:
+            status = "duplicate" if duplicate else "ok"
+        entry = {
+            "file": name,
+            "bytes": size,
+            "transferred": size,
+            "kind": asset_kind(url, content_type),
+            "status": status,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if entry["kind"] == "stylesheet":
+            # fonts and background images live behind the stylesheet
+            with open(path, encoding="utf-8", errors="replace") as f:
+                entry["references"] = unique_http_urls(css_urls(f.read(), response.url))
+        return entry
+
+    def run(self, html=None):
+        """Discover and download everything; returns a summary dict"""
+        start = time.perf_counter()
+        if html is None:
+            response = self.session.get(self.page_url, timeout=self.timeout)
+            response.raise_for_status()
+            html = response.text
+        pending = discover_assets(html, self.page_url)
+        queued = set(pending)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {executor.submit(self.fetch, url): url for url in pending}
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    url = running.pop(future)
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        entry = {"status": "failed", "error": str(e), "kind": asset_kind(url)}
+                    self.results[url] = entry
+                    for ref in entry.get("references", []):
+                        if ref not in queued:
+                            queued.add(ref)
+                            running[executor.submit(self.fetch, ref)] = ref
+
+        self.save_manifest()
+        entries = self.results.values()
+        elapsed = time.perf_counter() - start
+        return {
+            "assets": len(self.results),
+            "downloaded": sum(1 for e in entries if e["status"] == "ok"),
+            "duplicates": sum(1 for e in entries if e["status"] == "duplicate"),
+            "unchanged": sum(1 for e in entries if e["status"] == "unchanged"),
+            "failed": sum(1 for e in entries if e["status"] == "failed"),
+            # body bytes actually received, and the size of the files 304s let us keep
+            "bytes": sum(e.get("transferred", 0) for e in entries),
+            "skipped_bytes": sum(e.get("bytes", 0) - e.get("transferred", 0) for e in entries),
+            "by_kind": {kind: sum(1 for e in entries if e["kind"] == kind)
+                        for kind in sorted({e["kind"] for e in entries})},
+            "elapsed": elapsed,
+        }
+
+    def load_manifest(self):
+        path = os.path.join(self.assets_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f).get("assets", {})
+
+    def save_manifest(self):
+        """assets/manifest.json maps each asset URL to its stored file"""
+        path = os.path.join(self.assets_dir, MANIFEST_NAME)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"page": self.page_url, "assets": self.results}, f, indent=2)
+        os.replace(path + ".tmp", path)
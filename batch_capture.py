@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Batch Screenshot Capture
+Runs WebsiteScreenshotCapture over a URL list or sitemap in parallel across a
+bounded pool of browser sessions, with per-domain concurrency limits and a
+resumable manifest
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+
+from driver_pool import DriverPool
+from image_encoding import ENCODERS, EncodingPool, available_formats, print_report
+from screenshot_capture import WebsiteScreenshotCapture
+
+DEFAULT_WORKERS = 4
+DEFAULT_PER_DOMAIN = 2
+DEFAULT_OUTPUT_DIR = "screenshots_batch"
+MANIFEST_NAME = "manifest.json"
+REQUEST_TIMEOUT = 30
+
+# Capture steps that can be selected with --steps, in the order they run
+STEPS = {
+    "full_page": "capture_full_page",
+    "sections": "capture_viewport_sections",
+    "interactive": "capture_interactive_states",
+    "styles": "extract_colors_and_fonts",
+    "assets": "download_assets",
+}
+
+
+def read_sitemap(location, depth=0):
+    """Return page URLs from a sitemap URL or file, following sitemap indexes once"""
+    if location.startswith("http"):
+        response = requests.get(location, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        root = ET.fromstring(response.content)
+    else:
+        root = ET.parse(location).getroot()
+
+    urls = []
+    if root.tag.endswith("sitemapindex"):
+        if depth > 0:
+            return urls
+        for loc in root.iterfind("{*}sitemap/{*}loc"):
+            urls.extend(read_sitemap(loc.text.strip(), depth + 1))
+    else:
+        urls = [loc.text.strip() for loc in root.iterfind("{*}url/{*}loc") if loc.text]
+    return urls
+
+
+def read_url_list(path):
+    """Return URLs from a text file, one per line, ignoring blanks and # comments"""
+    urls = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                urls.append(line if line.startswith("http") else "https://" + line)
+    return urls
+
+
+def load_urls(source):
+    if source.endswith(".xml") or "sitemap" in os.path.basename(urlparse(source).path):
+        urls = read_sitemap(source)
+    else:
+        urls = read_url_list(source)
+    # keep the first occurrence of each URL, in order
+    return list(dict.fromkeys(urls))
+
+
+def output_dir_for(output_root, url):
+    """screenshots_batch/<domain>/<path slug> for a URL"""
+    parsed = urlparse(url)
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", (parsed.path + ("?" + parsed.query if parsed.query else "")).strip("/"))
+    return os.path.join(output_root, parsed.netloc or "unknown", slug or "index")
+
+
+class Manifest:
+    """Per-URL progress stored as JSON so an interrupted batch can resume"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def is_done(self, url):
+        return self.entries.get(url, {}).get("status") == "done"
+
+    def record(self, url, **entry):
+        self.entries[url] = entry
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class BatchCapture:
+    """Capture many URLs concurrently through a shared DriverPool"""
+
+    def __init__(self, urls, output_root=DEFAULT_OUTPUT_DIR, workers=DEFAULT_WORKERS,
+                 per_domain=DEFAULT_PER_DOMAIN, steps=None, max_pages=None, incremental=False, encoder=None):
+        self.urls = urls
+        self.output_root = output_root
+        self.workers = workers
+        self.per_domain = per_domain
+        self.steps = steps or list(STEPS)
+        self.max_pages = max_pages
+        self.incremental = incremental
+        self.encoder = encoder
+        os.makedirs(output_root, exist_ok=True)
+        self.manifest = Manifest(os.path.join(output_root, MANIFEST_NAME))
+
+    def capture_one(self, url, pool):
+        """Run the selected capture steps for one URL; returns (elapsed seconds, changed)"""
+        start = time.perf_counter()
+        capture = WebsiteScreenshotCapture(url, output_dir=output_dir_for(self.output_root, url),
+                                           driver_pool=pool, incremental=self.incremental, encoder=self.encoder)
+        for step in self.steps:
+            getattr(capture, STEPS[step])()
+        return time.perf_counter() - start, capture.change_report()["changed"]
+
+    def run(self):
+        """Capture every pending URL and return a summary dict"""
+        # an incremental refresh revisits every URL, only rewriting what changed
+        pending = deque(url for url in self.urls if self.incremental or not self.manifest.is_done(url))
+        skipped = len(self.urls) - len(pending)
+        if skipped:
+            print(f"⏭️  Skipping {skipped} URLs already done in {self.manifest.path}")
+
+        active_per_domain = defaultdict(int)
+        done = failed = 0
+        changed = []
+        start = time.perf_counter()
+        pool_kwargs = {"max_pages": self.max_pages} if self.max_pages else {}
+
+        with DriverPool(size=self.workers, **pool_kwargs) as pool, \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+
+            def schedule():
+                # hand out URLs whose domain still has capacity, in list order
+                deferred = deque()
+                while pending and len(running) < self.workers:
+                    url = pending.popleft()
+                    domain = urlparse(url).netloc
+                    if active_per_domain[domain] >= self.per_domain:
+                        deferred.append(url)
+                        continue
+                    active_per_domain[domain] += 1
+                    running[executor.submit(self.capture_one, url, pool)] = url
+                pending.extendleft(reversed(deferred))
+
+            schedule()
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    url = running.pop(future)
+                    active_per_domain[urlparse(url).netloc] -= 1
+                    try:
+                        seconds, page_changed = future.result()
+                    except Exception as e:
+                        failed += 1
+                        print(f"❌ {url}: {e}")
+                        self.manifest.record(url, status="failed", error=str(e))
+                    else:
+                        done += 1
+                        if page_changed:
+                            changed.append(url)
+                        print(f"{'🔄' if page_changed else '✅'} {url} ({seconds:.1f}s"
+                              f"{', changed' if page_changed and self.incremental else ''})")
+                        self.manifest.record(url, status="done", seconds=round(seconds, 3),
+                                             output_dir=output_dir_for(self.output_root, url),
+                                             changed=page_changed)
+                schedule()
+
+        elapsed = time.perf_counter() - start
+        return {
+            "captured": done,
+            "failed": failed,
+            "skipped": skipped,
+            "changed": changed,
+            "elapsed": elapsed,
+            "pages_per_minute": done / elapsed * 60 if elapsed else 0.0,
+            "chrome_starts": pool.created,
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Capture screenshots for many URLs in parallel")
+    parser.add_argument("source", help="text file with one URL per line, or a sitemap URL/file")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR,
+                        help=f"output directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"parallel browser sessions (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--per-domain", type=int, default=DEFAULT_PER_DOMAIN,
+                        help=f"max concurrent captures per domain (default: {DEFAULT_PER_DOMAIN})")
+    parser.add_argument("--steps", default=",".join(STEPS),
+                        help=f"comma-separated capture steps (default: {','.join(STEPS)})")
+    parser.add_argument("--max-pages", type=int, help="page loads per browser session before recycling")
+    parser.add_argument("--encode", help=f"re-encode screenshots in the background, comma-separated "
+                                         f"from {', '.join(ENCODERS)}")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-capture done URLs, skipping unchanged screenshots and assets (304s)")
+    args = parser.parse_args(argv)
+    args.steps = [step.strip() for step in args.steps.split(",") if step.strip()]
+    for step in args.steps:
+        if step not in STEPS:
+            parser.error(f"unknown step: {step}")
+    args.encode = [fmt.strip() for fmt in (args.encode or "").split(",") if fmt.strip()]
+    for fmt in args.encode:
+        if fmt not in available_formats():
+            parser.error(f"unknown or unsupported image format: {fmt}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 60)
+    print("  📸 BATCH SCREENSHOT CAPTURE")
+    print("=" * 60)
+
+    urls = load_urls(args.source)
+    print(f"\n🔗 {len(urls)} URLs from {args.source}")
+    print(f"🧵 {args.workers} browser workers, {args.per_domain} per domain")
+    print(f"📋 Steps: {', '.join(args.steps)}\n")
+
+    encoder = EncodingPool(args.encode) if args.encode else None
+    batch = BatchCapture(urls, args.output, args.workers, args.per_domain, args.steps, args.max_pages,
+                         args.incremental, encoder)
+    try:
+        summary = batch.run()
+    finally:
+        encoding_report = encoder.close() if encoder else None
+
+    print("\n" + "-" * 60)
+    print(f"✅ Captured: {summary['captured']}   ❌ Failed: {summary['failed']}   "
+          f"⏭️  Skipped: {summary['skipped']}")
+    print(f"⏱️  {summary['elapsed']:.1f}s, {summary['pages_per_minute']:.1f} pages/minute, "
+          f"{summary['chrome_starts']} Chrome starts")
+    if args.incremental:
+        print(f"🔄 Changed pages: {len(summary['changed'])}")
+        for url in summary["changed"]:
+            print(f"   {url}")
+    if encoding_report:
+        print("🗜️  Background encoding:")
+        print_report(encoding_report)
+    print(f"📁 Manifest: {batch.manifest.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Batch Screenshot to HTML Conversion
+Converts every screenshot in a directory or glob with ScreenshotToHTML,
+spread over a process pool sized to the machine's cores. Each input gets its
+own output directory, and a summary JSON records per-stage timings
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from analysis_cache import DEFAULT_CACHE_DIR, AnalysisCache
+from palette import BACKENDS, DEFAULT_BACKEND
+from screenshot_to_html import ScreenshotToHTML
+
+DEFAULT_OUTPUT_DIR = "cloned_sites"
+SUMMARY_NAME = "summary.json"
+# only the captured PNGs by default: image_encoding writes .webp/.avif copies next to them
+DEFAULT_EXTENSIONS = (".png",)
+STAGES = ("palette", "segmentation", "codegen")
+
+
+def collect_inputs(source, extensions=DEFAULT_EXTENSIONS):
+    """Screenshot paths with one of extensions from a directory (not recursive) or a glob pattern, sorted"""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths
+                  if os.path.isfile(path) and path.lower().endswith(tuple(extensions)))
+
+
+def output_dirs_for(output_root, paths):
+    """cloned_sites/<screenshot name> per input, numbered when names repeat"""
+    dirs, used = {}, set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, n = stem, 2
+        while name in used:
+            name, n = f"{stem}_{n}", n + 1
+        used.add(name)
+        dirs[path] = os.path.join(output_root, name)
+    return dirs
+
+
+def convert_one(path, output_dir, cache_dir=DEFAULT_CACHE_DIR, palette_backend=DEFAULT_BACKEND):
+    """Convert one screenshot; runs in a worker process and returns a result dict
+
+    Workers share the analysis cache directory; cache_dir=None disables it.
+    """
+    start = time.perf_counter()
+    with ScreenshotToHTML(path, cache=AnalysisCache(cache_dir) if cache_dir else False) as converter:
+        result = converter.convert_to_html(output_dir, verbose=False, palette_backend=palette_backend)
+    return {
+        "input": path,
+        "output_dir": output_dir,
+        "size": [converter.width, converter.height],
+        "tiled": converter.tiled is not None,
+        "colors": result["colors"],
+        "sections": len(result["sections"]),
+        "timings": {stage: round(seconds, 4) for stage, seconds in result["timings"].items()},
+        "cache_hits": converter.cache.hits if converter.cache else 0,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+class BatchConvert:
+    """Convert many screenshots in parallel worker processes"""
+
+    def __init__(self, paths, output_root=DEFAULT_OUTPUT_DIR, workers=None, cache_dir=DEFAULT_CACHE_DIR,
+                 palette_backend=DEFAULT_BACKEND):
+        self.paths = paths
+        self.output_root = output_root
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.palette_backend = palette_backend
+        self.output_dirs = output_dirs_for(output_root, paths)
+        os.makedirs(output_root, exist_ok=True)
+
+    def run(self):
+        """Convert every input and return the summary dict (also written as summary.json)"""
+        results, errors = [], []
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, max(1, len(self.paths)))) as executor:
+            futures = {executor.submit(convert_one, path, self.output_dirs[path], self.cache_dir,
+                                       self.palette_backend): path
+                       for path in self.paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append({"input": path, "error": str(e)})
+                    print(f"❌ {path}: {e}")
+                else:
+                    results.append(result)
+                    timings = result["timings"]
+                    print(f"{'⚡' if result['cache_hits'] else '✅'} {path} → {result['output_dir']} "
+                          f"({result['sections']} sections, "
+                          + ", ".join(f"{stage} {timings[stage]:.2f}s" for stage in STAGES) + ")")
+
+        elapsed = time.perf_counter() - start
+        results.sort(key=lambda result: result["input"])
+        summary = {
+            "converted": len(results),
+            "cached": sum(1 for result in results if result["cache_hits"]),
+            "failed": len(errors),
+            "workers": self.workers,
+            "elapsed": round(elapsed, 4),
+            "screenshots_per_second": round(len(results) / elapsed, 3) if elapsed else 0.0,
+            # summed over inputs, i.e. CPU seconds spent in each stage across the pool
+            "stage_totals": {stage: round(sum(result["timings"][stage] for result in results), 4)
+                             for stage in STAGES},
+            "results": results,
+            "errors": errors,
+        }
+        self.save_summary(summary)
+        return summary
+
+    def save_summary(self, summary):
+        path = os.path.join(self.output_root, SUMMARY_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert many screenshots to HTML/CSS in parallel")
+    parser.add_argument("source", help="directory of screenshots (e.g. screenshots/full_page) or a glob pattern")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR,
+                        help=f"output directory, one subdirectory per screenshot (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--extensions", default=",".join(DEFAULT_EXTENSIONS),
+                        help=f"comma-separated file extensions to convert (default: {','.join(DEFAULT_EXTENSIONS)})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--palette", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                        help=f"palette backend, histogram is the fast one (default: {DEFAULT_BACKEND})")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"analysis cache shared by the workers (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="always recompute palettes and layouts")
+    args = parser.parse_args(argv)
+    args.extensions = [ext.strip().lower() for ext in args.extensions.split(",") if ext.strip()]
+    args.extensions = [ext if ext.startswith(".") else "." + ext for ext in args.extensions]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 60)
+    print("  🧩 BATCH SCREENSHOT TO HTML")
+    print("=" * 60)
+
+    paths = collect_inputs(args.source, args.extensions)
+    if not paths:
+        print(f"\n❌ No screenshots found in {args.source}")
+        return
+
+    batch = BatchConvert(paths, args.output, args.workers, None if args.no_cache else args.cache_dir,
+                         args.palette)
+    print(f"\n🖼️  {len(paths)} screenshots from {args.source}")
+    print(f"⚙️  {batch.workers} worker processes, {args.palette} palette\n")
+
+    summary = batch.run()
+
+    print("\n" + "-" * 60)
+    print(f"✅ Converted: {summary['converted']}   ⚡ From cache: {summary['cached']}   "
+          f"❌ Failed: {summary['failed']}")
+    print(f"⏱️  {summary['elapsed']:.1f}s, {summary['screenshots_per_second']:.2f} screenshots/second")
+    print("📊 Stage totals: " + ", ".join(f"{stage} {summary['stage_totals'][stage]:.2f}s" for stage in STAGES))
+    print(f"📁 Summary: {os.path.join(args.output, SUMMARY_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the asset downloader
+Serves a generated fixture site (images with duplicates, srcset, a stylesheet
+with fonts and backgrounds, scripts) with artificial per-request latency and
+compares the old serial <img>-only loop against AssetDownloader
+"""
+
+import argparse
+import contextlib
+import functools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+import serve_portfolio
+from asset_downloader import AssetDownloader
+
+
+def build_fixture(directory, images=40, size=32 * 1024):
+    """Write a page with images (a quarter of them duplicates), srcset, CSS, fonts and scripts"""
+    os.makedirs(os.path.join(directory, "img"))
+    os.makedirs(os.path.join(directory, "fonts"))
+    img_tags = []
+    for i in range(images):
+        content = os.urandom(size) if i % 4 else b"duplicate" * (size // 9)
+        with open(os.path.join(directory, "img", f"photo_{i}.png"), "wb") as f:
+            f.write(content)
+        img_tags.append(f'<img src="img/photo_{i}.png" srcset="img/photo_{i}.png 1x, img/photo_{i}@2x.png 2x">')
+        with open(os.path.join(directory, "img", f"photo_{i}@2x.png"), "wb") as f:
+            f.write(content * 2)
+    for name in ("regular", "bold"):
+        with open(os.path.join(directory, "fonts", f"{name}.woff2"), "wb") as f:
+            f.write(os.urandom(size))
+    with open(os.path.join(directory, "hero.jpg"), "wb") as f:
+        f.write(os.urandom(size))
+    with open(os.path.join(directory, "styles.css"), "w") as f:
+        f.write('@font-face { font-family: A; src: url("fonts/regular.woff2"); }\n'
+                "@font-face { font-family: B; src: url(fonts/bold.woff2); }\n"
+                ".hero { background: url('hero.jpg'); }\n")
+    for name in ("app", "vendor"):
+        with open(os.path.join(directory, f"{name}.js"), "w") as f:
+            f.write("console.log('x');\n" * 500)
+    with open(os.path.join(directory, "index.html"), "w") as f:
+        f.write('<html><head><link rel="stylesheet" href="styles.css">'
+                '<script src="app.js"></script><script src="vendor.js"></script></head><body>'
+                + "\n".join(img_tags) + "</body></html>")
+
+
+@contextlib.contextmanager
+def fixture_server(directory, latency):
+    """Serve directory on an ephemeral port, sleeping latency seconds per request"""
+
+    class SlowHandler(serve_portfolio.MyHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            super().do_GET()
+
+    handler = functools.partial(SlowHandler, directory=directory)
+    server = serve_portfolio.ThreadPoolHTTPServer(("127.0.0.1", 0), handler, workers=64)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def serial_img_download(url, assets_dir):
+    """The previous download_assets loop: bare requests.get per <img>, one at a time"""
+    os.makedirs(assets_dir, exist_ok=True)
+    start = time.perf_counter()
+    soup = BeautifulSoup(requests.get(url).content, "html.parser")
+    files = total = 0
+    for i, img in enumerate(soup.find_all("img")):
+        img_url = urljoin(url, img.get("src"))
+        content = requests.get(img_url).content
+        file_ext = os.path.splitext(urlparse(img_url).path)[1] or ".jpg"
+        with open(f"{assets_dir}/image_{i}{file_ext}", "wb") as f:
+            f.write(content)
+        files += 1
+        total += len(content)
+    return {"files": files, "bytes": total, "elapsed": time.perf_counter() - start}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark asset downloading against a local fixture")
+    parser.add_argument("--images", type=int, default=40, help="images on the fixture page")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of server latency per request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 16], help="downloader worker counts")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 60)
+    print("  ASSET DOWNLOAD BENCHMARK")
+    print("=" * 60)
+
+    root = tempfile.mkdtemp(prefix="asset_bench_")
+    try:
+        site = os.path.join(root, "site")
+        build_fixture(site, args.images)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull), \
+                fixture_server(site, args.latency) as url:
+            print(f"\n🌐 {url} ({args.images} images, {args.latency * 1000:.0f}ms latency per request)\n")
+
+            result = serial_img_download(url, os.path.join(root, "serial"))
+            print(f"  {'serial <img> only':<22} {result['elapsed']:>7.2f} s   {result['files']:>4} files   "
+                  f"{result['bytes'] / 1024:>7.0f} KB on disk")
+
+            for workers in args.workers:
+                assets_dir = os.path.join(root, f"pooled_{workers}")
+                summary = AssetDownloader(url, assets_dir, workers=workers).run()
+                on_disk = sum(os.path.getsize(os.path.join(assets_dir, name))
+                              for name in os.listdir(assets_dir) if name != "manifest.json")
+                print(f"  {f'downloader x{workers}':<22} {summary['elapsed']:>7.2f} s   "
+                      f"{summary['downloaded']:>4} files   {on_disk / 1024:>7.0f} KB on disk   "
+                      f"{summary['assets']} URLs, {summary['duplicates']} duplicates, {summary['failed']} failed")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
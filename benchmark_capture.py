@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Timing benchmark for WebsiteScreenshotCapture
+Captures a locally served copy of portfolio_clone/ so numbers don't depend on
+the network
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import serve_portfolio
+from driver_pool import DriverPool
+from screenshot_capture import WebsiteScreenshotCapture
+
+CAPTURE_STEPS = ["capture_full_page", "capture_viewport_sections", "capture_interactive_states",
+                 "extract_colors_and_fonts"]
+
+
+@contextlib.contextmanager
+def local_site(directory=serve_portfolio.DIRECTORY):
+    """Serve directory on an ephemeral port for the duration of the block"""
+    server = serve_portfolio.create_server(0, directory=directory)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def run_captures(url, pool, count, output_root):
+    """Run every capture step for count URLs through pool
+
+    Returns (elapsed seconds, seconds saved by readiness waits over fixed sleeps).
+    """
+    start = time.perf_counter()
+    saved = 0.0
+    for i in range(count):
+        capture = WebsiteScreenshotCapture(url, output_dir=os.path.join(output_root, f"run_{i}"),
+                                           driver_pool=pool)
+        for step in CAPTURE_STEPS:
+            getattr(capture, step)()
+        saved += capture.readiness_report()["saved"]
+    return time.perf_counter() - start, saved
+
+
+def benchmark_pool(args, url, output_root):
+    """Chrome per capture method (the old behaviour) against a warm shared pool"""
+    print(f"\n📊 Driver pool ({args.urls} URLs x {len(CAPTURE_STEPS)} capture steps)")
+    for label, max_pages in (("chrome per method", 1), ("pooled sessions", args.max_pages)):
+        with DriverPool(size=1, max_pages=max_pages) as pool:
+            elapsed, saved = run_captures(url, pool, args.urls,
+                                          os.path.join(output_root, label.replace(" ", "_")))
+        print(f"  {label:<22} {elapsed:>8.2f} s total   {elapsed / args.urls:>7.2f} s/URL   "
+              f"{pool.created} Chrome starts   {saved / args.urls:.2f} s/URL saved by readiness waits")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark screenshot capture against a local site")
+    parser.add_argument("--urls", type=int, default=3, help="how many times to capture the site")
+    parser.add_argument("--max-pages", type=int, default=50, help="pages per session before recycling")
+    parser.add_argument("--keep", action="store_true", help="keep the captured screenshots")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("  SCREENSHOT CAPTURE BENCHMARK")
+    print("=" * 60)
+
+    output_root = tempfile.mkdtemp(prefix="capture_bench_")
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull), local_site() as url:
+            print(f"\n🌐 Capturing {url}")
+            benchmark_pool(args, url, output_root)
+    finally:
+        if args.keep:
+            print(f"\n📁 Screenshots kept in {output_root}")
+        else:
+            shutil.rmtree(output_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
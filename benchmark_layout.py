@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark for layout segmentation
+Compares the original row-mean loop against the XY-cut engine on synthetic
+light and dark pages (or given screenshots)
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmark_palette import synthetic_page
+from layout_segmentation import count_boxes, segment_image, top_level_sections
+
+
+def legacy_sections(image):
+    """The original detect_layout_sections: a Python loop over row means, threshold 240"""
+    img_array = np.array(image.convert("L"))
+    row_means = np.mean(img_array, axis=1)
+    boundaries = []
+    for i in range(1, len(row_means) - 1):
+        if row_means[i] > 240 and row_means[i - 1] <= 240:
+            boundaries.append(i)
+    if not boundaries:
+        boundaries = [0, image.height // 3, 2 * image.height // 3, image.height]
+    return [{"top": top, "bottom": bottom} for top, bottom in zip(boundaries, boundaries[1:])]
+
+
+def timed(function, image, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function(image)
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark layout segmentation")
+    parser.add_argument("images", nargs="*", help="screenshots to use instead of synthetic pages")
+    parser.add_argument("--runs", type=int, default=3, help="runs per engine, the median is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 60)
+    print("  LAYOUT SEGMENTATION BENCHMARK")
+    print("=" * 60)
+
+    if args.images:
+        images = [(path, Image.open(path)) for path in args.images]
+    else:
+        images = [("light 1920x1080", synthetic_page(height=1080)),
+                  ("light 1920x20000", synthetic_page(height=20000)),
+                  ("dark 1920x20000", synthetic_page(height=20000, dark=True))]
+
+    for name, image in images:
+        image.load()
+        print(f"\n🖼️  {name}")
+        sections, seconds = timed(legacy_sections, image, args.runs)
+        print(f"  {'row-mean loop':<14} {seconds * 1000:>8.1f} ms   {len(sections):>4} sections")
+        tree, seconds = timed(segment_image, image, args.runs)
+        print(f"  {'xy-cut':<14} {seconds * 1000:>8.1f} ms   {len(top_level_sections(tree)):>4} sections   "
+              f"{count_boxes(tree)} boxes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the palette backends
+Times each backend on synthetic full-page screenshots (or given images) and
+compares every palette against the KMeans one
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from palette import BACKENDS, extract_palette, palette_distance
+
+
+def synthetic_page(width=1920, height=8000, dark=False, seed=0):
+    """A screenshot-like page: header, gradient hero, card grid, text rows and a footer"""
+    rng = np.random.default_rng(seed)
+    background = (18, 18, 24) if dark else (250, 250, 252)
+    text = (220, 220, 230) if dark else (40, 40, 48)
+    accent = (99, 102, 241)
+    image = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(image)
+
+    draw.rectangle((0, 0, width, 80), fill=(30, 30, 40) if dark else (255, 255, 255))
+    for i in range(5):
+        draw.rectangle((width - 700 + i * 130, 30, width - 620 + i * 130, 50), fill=text)
+
+    hero = np.linspace(0, 1, width)[None, :, None]
+    hero = (np.array(accent) * (1 - hero) + np.array((236, 72, 153)) * hero).astype(np.uint8)
+    image.paste(Image.fromarray(np.repeat(hero, 600, axis=0)), (0, 80))
+
+    y = 760
+    while y < height - 400:
+        if rng.random() < 0.4:
+            for col in range(3):
+                x = 160 + col * 540
+                draw.rounded_rectangle((x, y, x + 480, y + 320), 12, fill=(32, 32, 44) if dark else (255, 255, 255),
+                                       outline=(60, 60, 70) if dark else (226, 226, 232))
+                draw.rectangle((x + 24, y + 24, x + 456, y + 180), fill=tuple(int(v) for v in rng.integers(40, 220, 3)))
+                for line in range(4):
+                    draw.rectangle((x + 24, y + 200 + line * 26, x + 24 + int(rng.integers(200, 420)), y + 212 + line * 26),
+                                   fill=text)
+            y += 400
+        else:
+            for line in range(int(rng.integers(4, 12))):
+                draw.rectangle((160, y, 160 + int(rng.integers(600, 1500)), y + 14), fill=text)
+                y += 30
+            draw.rounded_rectangle((160, y + 10, 360, y + 60), 8, fill=accent)
+            y += 120
+
+    draw.rectangle((0, height - 320, width, height), fill=(44, 62, 80))
+    return image
+
+
+def time_backend(image, backend, n_colors, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        colors = extract_palette(image, n_colors, backend)
+        timings.append(time.perf_counter() - start)
+    return colors, statistics.median(timings)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark palette extraction backends")
+    parser.add_argument("images", nargs="*", help="screenshots to use instead of synthetic pages")
+    parser.add_argument("--colors", type=int, default=10, help="palette size")
+    parser.add_argument("--runs", type=int, default=5, help="runs per backend, the median is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 60)
+    print("  PALETTE BACKEND BENCHMARK")
+    print("=" * 60)
+
+    if args.images:
+        images = [(path, Image.open(path)) for path in args.images]
+    else:
+        images = [("light 1920x1080", synthetic_page(height=1080)),
+                  ("light 1920x8000", synthetic_page()),
+                  ("dark 1920x20000", synthetic_page(height=20000, dark=True))]
+
+    backends = list(BACKENDS)
+    try:
+        import sklearn  # noqa: F401
+    except ImportError:
+        backends.remove("kmeans")
+        print("\n⚠️  scikit-learn not installed, skipping the KMeans reference")
+
+    for name, image in images:
+        image.load()
+        print(f"\n🖼️  {name}")
+        reference = None
+        for backend in sorted(backends, key=lambda b: b != "kmeans"):
+            colors, seconds = time_backend(image, backend, args.colors, args.runs)
+            if backend == "kmeans":
+                reference = colors
+            similarity = f"{palette_distance(colors, reference):6.1f}" if reference else "     -"
+            print(f"  {backend:<11} {seconds * 1000:>9.1f} ms   distance to kmeans {similarity}   "
+                  f"{' '.join(colors[:6])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the portfolio servers
+Compares requests/sec and latency percentiles between serving modes
+"""
+
+import argparse
+import contextlib
+import http.client
+import math
+import os
+import socket
+import threading
+import time
+
+import serve_portfolio
+import simple_server
+
+PATHS = ["/", "/styles.css", "/script.js", "/assets/favicon.svg"]
+
+
+class QuietCustomHandler(simple_server.CustomHandler):
+    access_log = None
+
+
+class HTTP10CustomHandler(QuietCustomHandler):
+    protocol_version = "HTTP/1.0"
+
+
+class CountingHTTPServer(simple_server.ThreadingHTTPServer):
+    """ThreadingHTTPServer that counts accepted connections"""
+
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def start_in_background(server):
+    """Run serve_forever on a daemon thread and return the bound port"""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server.server_address[1]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def fetch(port, path, headers=None):
+    """Fetch one path on a fresh connection and return the response size"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        return len(response.read())
+    finally:
+        conn.close()
+
+
+def slow_client(port, delay, stop):
+    """Hold a connection open with an unfinished request, like a slow visitor"""
+    while not stop.is_set():
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=30) as sock:
+                sock.sendall(b"GET / HTTP/1.0\r\n")
+                stop.wait(delay)
+                sock.sendall(b"\r\n")
+                while sock.recv(65536):
+                    pass
+        except OSError:
+            return
+
+
+def idle_client(port, stop):
+    """Connect and send nothing, like a browser preconnect; returns once the server hangs up"""
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=30) as sock:
+            while not stop.is_set() and sock.recv(65536):
+                pass
+    except OSError:
+        pass
+
+
+def run_load(port, concurrency, requests_per_client, slow_clients=0, slow_delay=0.2, headers=None):
+    """Drive the server with concurrent clients and collect per-request latencies"""
+    latencies = []
+    body_bytes = []
+    errors = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def client():
+        local = []
+        received = 0
+        for i in range(requests_per_client):
+            path = PATHS[i % len(PATHS)]
+            start = time.perf_counter()
+            try:
+                received += fetch(port, path, headers)
+            except OSError as e:
+                errors.append(e)
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            body_bytes.append(received)
+
+    slow = [threading.Thread(target=slow_client, args=(port, slow_delay, stop), daemon=True)
+            for _ in range(slow_clients)]
+    for thread in slow:
+        thread.start()
+
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for thread in slow:
+        thread.join(timeout=slow_delay * 2 + 1)
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed": elapsed,
+        "bytes": sum(body_bytes),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def print_result(label, result):
+    print(f"  {label:<28} {result['rps']:>9.1f} req/s   "
+          f"p50 {result['p50_ms']:>7.2f} ms   p99 {result['p99_ms']:>8.2f} ms   "
+          f"({result['requests']} ok, {result['errors']} errors)")
+
+
+def benchmark_modes(args):
+    """Compare the single-connection TCPServer against the threaded worker pool"""
+    print(f"\n📊 Serving modes ({args.concurrency} clients x {args.requests} requests, "
+          f"{args.slow_clients} slow clients)")
+    for mode in ("single", "threaded"):
+        server = serve_portfolio.create_server(0, mode, args.workers, args.backlog, timeout=args.timeout)
+        try:
+            port = start_in_background(server)
+            result = run_load(port, args.concurrency, args.requests,
+                              args.slow_clients, args.slow_delay)
+            print_result(mode, result)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def benchmark_idle(args):
+    """Threaded server with at least as many idle connections as workers
+
+    Every worker is taken by an idle client, so a real request waits until
+    the read timeout frees one; server_close() is timed with them still open.
+    """
+    idle = max(args.idle_clients or args.workers, args.workers)
+    print(f"\n📊 Idle connections ({idle} idle clients, {args.workers} workers, {args.timeout:g}s timeout)")
+    server = serve_portfolio.create_server(0, "threaded", args.workers, args.backlog, timeout=args.timeout)
+    stop = threading.Event()
+    try:
+        port = start_in_background(server)
+        idlers = [threading.Thread(target=idle_client, args=(port, stop), daemon=True) for _ in range(idle)]
+        for thread in idlers:
+            thread.start()
+        time.sleep(0.2)  # let the idle connections reach the workers first
+        result = run_load(port, 1, len(PATHS))
+        print_result("requests behind idle clients", result)
+
+        # hold the workers again, then time closing the server under them
+        for thread in idlers:
+            thread.join()
+        idlers = [threading.Thread(target=idle_client, args=(port, stop), daemon=True) for _ in range(idle)]
+        for thread in idlers:
+            thread.start()
+        time.sleep(0.2)
+    finally:
+        server.shutdown()
+        start = time.perf_counter()
+        server.server_close()
+        print(f"  {'server_close()':<28} {time.perf_counter() - start:>9.2f} s with idle clients connected")
+        stop.set()
+
+
+def benchmark_encoding(args):
+    """Compare raw against precompressed serving on the threaded server"""
+    print(f"\n📊 Content encoding ({args.concurrency} clients x {args.requests} requests)")
+    variants = [
+        ("identity", {}),
+        ("gzip", {"Accept-Encoding": "gzip"}),
+        ("br, gzip", {"Accept-Encoding": "br, gzip"}),
+    ]
+    server = serve_portfolio.create_server(0, "threaded", args.workers, args.backlog)
+    try:
+        port = start_in_background(server)
+        for label, headers in variants:
+            result = run_load(port, args.concurrency, args.requests, headers=headers)
+            print_result(label, result)
+            print(f"  {'':<28} {result['bytes'] / max(result['requests'], 1):>9.0f} body bytes/request")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def load_page(port, keep_alive):
+    """Fetch the page and its assets the way a browser would, one connection if allowed"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        for path in PATHS:
+            if not keep_alive:
+                conn.close()
+            conn.request("GET", path)
+            conn.getresponse().read()
+    finally:
+        conn.close()
+
+
+def benchmark_keepalive(args):
+    """Compare connections opened and page-load time with and without keep-alive"""
+    pages = args.concurrency * args.requests // len(PATHS)
+    print(f"\n📊 Keep-alive ({args.concurrency} visitors, {pages} page loads of {len(PATHS)} requests)")
+    for label, handler, keep_alive in (
+        ("HTTP/1.0 close", HTTP10CustomHandler, False),
+        ("HTTP/1.1 keep-alive", QuietCustomHandler, True),
+    ):
+        server = CountingHTTPServer(("127.0.0.1", 0), handler)
+        try:
+            port = start_in_background(server)
+            page_times = []
+            lock = threading.Lock()
+
+            def visitor(count):
+                local = []
+                for _ in range(count):
+                    start = time.perf_counter()
+                    load_page(port, keep_alive)
+                    local.append(time.perf_counter() - start)
+                with lock:
+                    page_times.extend(local)
+
+            visitors = [threading.Thread(target=visitor, args=(pages // args.concurrency,))
+                        for _ in range(args.concurrency)]
+            start = time.perf_counter()
+            for thread in visitors:
+                thread.start()
+            for thread in visitors:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            print(f"  {label:<28} {len(page_times) / elapsed:>9.1f} pages/s  "
+                  f"page p50 {percentile(page_times, 50) * 1000:>7.2f} ms   "
+                  f"p99 {percentile(page_times, 99) * 1000:>8.2f} ms   "
+                  f"{server.connections / max(len(page_times), 1):.2f} connections/page")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+SCENARIOS = {
+    "modes": benchmark_modes,
+    "encoding": benchmark_encoding,
+    "keepalive": benchmark_keepalive,
+    "idle": benchmark_idle,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the portfolio servers")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--workers", type=int, default=serve_portfolio.DEFAULT_WORKERS,
+                        help="worker threads for the threaded server")
+    parser.add_argument("--backlog", type=int, default=serve_portfolio.DEFAULT_BACKLOG,
+                        help="accept backlog for the threaded server")
+    parser.add_argument("--slow-clients", type=int, default=2,
+                        help="idle connections that trickle their request in")
+    parser.add_argument("--slow-delay", type=float, default=0.2,
+                        help="seconds each slow client holds its request open")
+    parser.add_argument("--idle-clients", type=int,
+                        help="connections that never send anything in the idle scenario (default: --workers)")
+    parser.add_argument("--timeout", type=float, default=serve_portfolio.DEFAULT_TIMEOUT,
+                        help="read timeout for the threaded server's connections")
+    parser.add_argument("--verbose", action="store_true", help="keep the servers' request log output")
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario: {name}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("  PORTFOLIO SERVER BENCHMARK")
+    print("=" * 60)
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stderr(devnull))
+        for name in args.scenarios or SCENARIOS:
+            SCENARIOS[name](args)
+
+
+if __name__ == "__main__":
+    main()
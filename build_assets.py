@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Build step for the portfolio assets
+Writes precompressed .gz (and .br when the brotli package is installed) siblings
+next to each text asset so the servers never compress per request.
+With --fingerprint, first copies the site to portfolio_dist/ with content-hashed
+asset names (styles.<hash>.css) and rewrites the references in the HTML and
+the url()/@import references in the CSS.
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import urllib.parse
+
+from static_handler import COMPRESSIBLE_EXTENSIONS, FINGERPRINT_LENGTH
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIRECTORY = "portfolio_clone"
+DIST_DIRECTORY = "portfolio_dist"
+
+# Assets referenced from HTML that get content-hashed names; HTML itself keeps
+# its name so URLs stay stable
+FINGERPRINT_EXTENSIONS = {".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+                          ".ico", ".woff", ".woff2"}
+REFERENCE_PATTERN = re.compile(r"""(\b(?:href|src)\s*=\s*["'])([^"']+)(["'])""")
+CSS_URL_PATTERN = re.compile(r"""(\burl\(\s*["']?)([^"')\s]+)(["']?\s*\))""", re.IGNORECASE)
+CSS_IMPORT_PATTERN = re.compile(r"""(@import\s+["'])([^"']+)(["'])""", re.IGNORECASE)
+
+
+def gzip_bytes(data):
+    # mtime=0 keeps the output (and so its ETag) identical across builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data):
+    return brotli.compress(data, quality=11)
+
+
+def available_compressors():
+    """(suffix, compress function) pairs for the encodings we can build here"""
+    compressors = [(".gz", gzip_bytes)]
+    if brotli is not None:
+        compressors.insert(0, (".br", brotli_bytes))
+    return compressors
+
+
+def iter_assets(directory):
+    """Yield paths of compressible files under directory"""
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                yield os.path.join(root, name)
+
+
+def write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def precompress(directory=DIRECTORY, force=False):
+    """Write compressed siblings for every text asset and return a size report
+
+    Siblings that are already newer than their source are left alone unless
+    force is set. A variant that doesn't beat the raw file is not kept.
+    """
+    report = []
+    compressors = available_compressors()
+    for path in iter_assets(directory):
+        source_st = os.stat(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        row = {"path": os.path.relpath(path, directory), "raw": len(data)}
+        for suffix, compress in compressors:
+            variant = path + suffix
+            try:
+                fresh = os.stat(variant).st_mtime_ns >= source_st.st_mtime_ns
+            except OSError:
+                fresh = False
+            if fresh and not force:
+                row[suffix] = os.path.getsize(variant)
+                continue
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                write_atomic(variant, compressed)
+                row[suffix] = len(compressed)
+            elif os.path.exists(variant):
+                os.remove(variant)
+        report.append(row)
+    return report
+
+
+def fingerprinted_name(name, data):
+    base, ext = os.path.splitext(name)
+    return f"{base}.{hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def reference_target(ref, base_dir):
+    """Site-relative path a local reference points at, or None for external/data URLs"""
+    parts = urllib.parse.urlsplit(ref)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    if parts.path.startswith("/"):
+        return parts.path.lstrip("/")
+    return os.path.normpath(os.path.join(base_dir, parts.path)).replace(os.sep, "/")
+
+
+def rewrite_references(text, base_dir, renames, patterns=(REFERENCE_PATTERN, CSS_URL_PATTERN)):
+    """Point local references (href/src attributes, CSS url()) at the fingerprinted names in renames"""
+    def replace(match):
+        target = reference_target(match.group(2), base_dir)
+        if target not in renames:
+            return match.group(0)
+        parts = urllib.parse.urlsplit(match.group(2))
+        new_path = parts.path[:parts.path.rfind("/") + 1] + os.path.basename(renames[target])
+        ref = urllib.parse.urlunsplit(parts._replace(path=new_path))
+        return match.group(1) + ref + match.group(3)
+
+    for pattern in patterns:
+        text = pattern.sub(replace, text)
+    return text
+
+
+def css_references(css, base_dir):
+    """Site-relative paths a stylesheet references through url() or @import"""
+    return {reference_target(match.group(2), base_dir)
+            for pattern in (CSS_URL_PATTERN, CSS_IMPORT_PATTERN) for match in pattern.finditer(css)}
+
+
+def check_out_dir(directory, out_dir):
+    """Refuse output directories whose removal or filling would touch the source tree"""
+    source = os.path.realpath(directory)
+    out = os.path.realpath(out_dir)
+    if out == source or source.startswith(out + os.sep) or out.startswith(source + os.sep):
+        raise ValueError(f"output directory {out_dir} overlaps the source directory {directory}")
+
+
+def fingerprint(directory=DIRECTORY, out_dir=DIST_DIRECTORY):
+    """Copy directory to out_dir with content-hashed asset names
+
+    Returns {old relative path: new relative path} for every renamed asset.
+    Stylesheets are renamed after the files they reference, so their hashes
+    cover the rewritten url()s. Raises ValueError when out_dir is, contains or
+    is inside directory, since out_dir is deleted first.
+    """
+    check_out_dir(directory, out_dir)
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    shutil.copytree(directory, out_dir, ignore=shutil.ignore_patterns("*.gz", "*.br", "*.tmp"))
+
+    renames = {}
+    html_files = []
+    stylesheets = {}
+
+    def rename(path, data):
+        root, name = os.path.split(path)
+        new_name = fingerprinted_name(name, data)
+        os.rename(path, os.path.join(root, new_name))
+        rel = os.path.relpath(path, out_dir).replace(os.sep, "/")
+        renames[rel] = os.path.relpath(os.path.join(root, new_name), out_dir).replace(os.sep, "/")
+
+    for root, _, files in os.walk(out_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            ext = os.path.splitext(name)[1].lower()
+            if ext in (".html", ".htm"):
+                html_files.append(path)
+            elif ext == ".css":
+                stylesheets[os.path.relpath(path, out_dir).replace(os.sep, "/")] = path
+            elif ext in FINGERPRINT_EXTENSIONS:
+                with open(path, "rb") as f:
+                    rename(path, f.read())
+
+    # stylesheets that @import or url() other stylesheets go after them
+    pending = {}
+    for rel, path in stylesheets.items():
+        with open(path, encoding="utf-8", newline="") as f:
+            pending[rel] = f.read()
+    while pending:
+        ready = [rel for rel, css in pending.items()
+                 if not css_references(css, os.path.dirname(rel)) & (pending.keys() - {rel})]
+        for rel in ready or sorted(pending):  # a cycle can't be ordered; take them as they are
+            css = rewrite_references(pending.pop(rel), os.path.dirname(rel), renames,
+                                     (CSS_URL_PATTERN, CSS_IMPORT_PATTERN))
+            data = css.encode("utf-8")
+            with open(stylesheets[rel], "wb") as f:
+                f.write(data)
+            rename(stylesheets[rel], data)
+
+    for path in html_files:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        html_dir = os.path.relpath(os.path.dirname(path), out_dir)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(rewrite_references(html, html_dir, renames))
+    return renames
+
+
+def print_report(report):
+    suffixes = [suffix for suffix, _ in available_compressors()]
+    print(f"\n{'asset':<28} {'raw':>9}" + "".join(f" {suffix:>9} {'saved':>7}" for suffix in suffixes))
+    totals = {"raw": 0}
+    for row in report:
+        line = f"{row['path']:<28} {row['raw']:>9,}"
+        totals["raw"] += row["raw"]
+        for suffix in suffixes:
+            size = row.get(suffix, row["raw"])
+            totals[suffix] = totals.get(suffix, 0) + size
+            saved = 100 * (1 - size / row["raw"]) if row["raw"] else 0
+            line += f" {size:>9,} {saved:>6.1f}%"
+        print(line)
+    line = f"{'total':<28} {totals['raw']:>9,}"
+    for suffix in suffixes:
+        saved = 100 * (1 - totals[suffix] / totals["raw"]) if totals["raw"] else 0
+        line += f" {totals[suffix]:>9,} {saved:>6.1f}%"
+    print(line)
+    if brotli is None:
+        print("\nℹ️  brotli package not installed - only .gz variants were built")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build precompressed portfolio assets")
+    parser.add_argument("directory", nargs="?", default=DIRECTORY,
+                        help=f"asset directory (default: {DIRECTORY})")
+    parser.add_argument("--force", action="store_true", help="rebuild variants that look up to date")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="build a copy with content-hashed asset names and precompress that")
+    parser.add_argument("--out", default=DIST_DIRECTORY,
+                        help=f"output directory for --fingerprint (default: {DIST_DIRECTORY})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.directory == DIRECTORY and args.out == DIST_DIRECTORY:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("  PORTFOLIO ASSET BUILD")
+    print("=" * 60)
+
+    directory = args.directory
+    if args.fingerprint:
+        print(f"\n🔖 Fingerprinting {directory}/ into {args.out}/...")
+        try:
+            renames = fingerprint(directory, args.out)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        for old, new in renames.items():
+            print(f"   • {old} -> {new}")
+        directory = args.out
+
+    print(f"\n🗜️  Precompressing assets in {directory}/...")
+    report = precompress(directory, force=args.force)
+    print_report(report)
+    print(f"\n✅ Precompressed {len(report)} assets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Change tracking for incremental re-captures
+Keeps perceptual hashes of previously saved screenshots so an unchanged
+screenshot isn't rewritten, and reports which outputs of a page changed
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 16          # 16x16 difference hash, 256 bits per tile
+HASH_THRESHOLD = 6      # bits that may differ per tile before a tile counts as changed
+MANIFEST_NAME = "capture_manifest.json"
+
+
+def perceptual_hash(image):
+    """Difference hash per square tile, top to bottom, as hex strings
+
+    Tall full-page captures are split into width x width tiles so a change in
+    one section still shows up.
+    """
+    gray = image.convert("L")
+    width, height = gray.size
+    hashes = []
+    for top in range(0, height, width):
+        tile = gray.crop((0, top, width, min(top + width, height)))
+        pixels = np.asarray(tile.resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR), dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+        hashes.append(np.packbits(bits).tobytes().hex())
+    return hashes
+
+
+def hashes_match(old, new, threshold=HASH_THRESHOLD):
+    if len(old) != len(new):
+        return False
+    return all(bin(int(a, 16) ^ int(b, 16)).count("1") <= threshold for a, b in zip(old, new))
+
+
+class CaptureManifest:
+    """Perceptual hashes of saved screenshots plus what changed in this run"""
+
+    def __init__(self, output_dir, incremental=True):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.output_dir = output_dir
+        self.screenshots = {}
+        self.changed = []
+        self.unchanged = []
+        # hashes are always recorded, but only compared against in incremental mode
+        if incremental and os.path.exists(self.path):
+            with open(self.path) as f:
+                self.screenshots = json.load(f).get("screenshots", {})
+
+    def save_png(self, path, png):
+        """Write png bytes to path unless a perceptually identical image is already there
+
+        Returns True if the file was written.
+        """
+        key, entry = self._compare(path, Image.open(io.BytesIO(png)))
+        if entry is None:
+            return False
+
+        with open(path, "wb") as f:
+            f.write(png)
+        self._record(key, entry)
+        return True
+
+    def replace_png(self, path, new_path):
+        """Move the PNG at new_path onto path unless it's perceptually identical to it
+
+        For images streamed to disk (stitched pages) rather than held as bytes.
+        Returns True if path was replaced; new_path is gone either way.
+        """
+        with Image.open(new_path) as image:
+            key, entry = self._compare(path, image)
+        if entry is None:
+            os.remove(new_path)
+            return False
+
+        os.replace(new_path, path)
+        self._record(key, entry)
+        return True
+
+    def _compare(self, path, image):
+        """(key, hash entry) for image, with entry None if path already shows it"""
+        key = os.path.relpath(path, self.output_dir).replace(os.sep, "/")
+        entry = {"size": list(image.size), "phash": perceptual_hash(image)}
+        previous = self.screenshots.get(key)
+        if (previous and os.path.exists(path) and previous["size"] == entry["size"]
+                and hashes_match(previous["phash"], entry["phash"])):
+            self.unchanged.append(key)
+            return key, None
+        return key, entry
+
+    def _record(self, key, entry):
+        self.screenshots[key] = entry
+        self.changed.append(key)
+        self.save()
+
+    def note(self, key, changed):
+        """Record a non-screenshot output (style info, assets) as changed or not"""
+        (self.changed if changed else self.unchanged).append(key)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"screenshots": self.screenshots}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,130 @@
+"""
+Pool of warm headless Chrome sessions
+Lets WebsiteScreenshotCapture reuse browsers across capture methods and URLs
+instead of paying Chrome startup for every step
+"""
+
+import queue
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+DEFAULT_POOL_SIZE = 2
+MAX_PAGES_PER_DRIVER = 50
+
+
+def default_chrome_options():
+    """Headless Chrome options used for every capture"""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    return options
+
+
+class DriverPool:
+    """Bounded pool of reusable webdriver.Chrome sessions
+
+    A session is health-checked before it is handed out and recycled
+    (quit and replaced on demand) after max_pages page loads.
+    """
+
+    def __init__(self, chrome_options=None, size=DEFAULT_POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER):
+        self.chrome_options = chrome_options or default_chrome_options()
+        self.size = size
+        self.max_pages = max_pages
+        self.created = 0
+        self.recycled = 0
+        self._idle = queue.LifoQueue()  # most recently used first, it's the warmest
+        self._pages = {}
+        self._window_sizes = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def acquire(self, timeout=None):
+        """Check out a healthy driver, starting Chrome only if no warm one is idle"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("no browser session became available")
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._start()
+                if self._healthy(driver):
+                    return driver
+                self._discard(driver)
+        except:
+            self._slots.release()
+            raise
+
+    def release(self, driver):
+        """Return a driver to the pool, recycling it if it's used up or broken"""
+        try:
+            if self._closed or self._pages.get(id(driver), 0) >= self.max_pages:
+                self._discard(driver)
+                self.recycled += 1
+                return
+            try:
+                # don't leak cookies, running scripts or a resized window
+                # into the next capture
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+                size = self._window_sizes.get(id(driver))
+                if size:
+                    driver.set_window_size(size["width"], size["height"])
+            except Exception:
+                self._discard(driver)
+                return
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    def count_page(self, driver):
+        """Note a page load on driver, for recycling after max_pages"""
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+
+    def close(self):
+        """Quit every idle driver; drivers still checked out are quit on release"""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self):
+        driver = webdriver.Chrome(options=self.chrome_options)
+        size = driver.get_window_size()
+        with self._lock:
+            self.created += 1
+            self._pages[id(driver)] = 0
+            self._window_sizes[id(driver)] = size
+        return driver
+
+    def _healthy(self, driver):
+        # a dead chromedriver surfaces as urllib3 errors, not WebDriverException
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._window_sizes.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,534 @@
+"""
+HTML/CSS code generation for ScreenshotToHTML
+Page templates are compiled once at import into literal text and $fields and
+rendered straight into the output file, so nothing is built up in memory.
+Each top-level section is written by a renderer looked up by section type
+(see SECTION_RENDERERS / register_renderer); the default one lays out the
+section's nested boxes from the detected layout tree as rows and column grids
+"""
+
+import io
+import re
+
+FIELD = re.compile(r"\$(?:\{(\w+)\}|(\w+))")
+
+
+class CompiledTemplate:
+    """Template text split once into (literal, field) pieces
+
+    Fields are written as $name or ${name}; render() writes the pieces in
+    order instead of building the string.
+    """
+
+    def __init__(self, text):
+        self.parts = []
+        position = 0
+        for match in FIELD.finditer(text):
+            self.parts.append((text[position:match.start()], match.group(1) or match.group(2)))
+            position = match.end()
+        self.tail = text[position:]
+
+    def render(self, write, **values):
+        for literal, field in self.parts:
+            write(literal)
+            write(str(values[field]))
+        write(self.tail)
+
+
+PAGE_START = CompiledTemplate("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>${title}</title>
+    <link rel="stylesheet" href="styles.css">
+</head>
+<body>
+    <!-- Header Section -->
+    <header class="site-header">
+        <nav class="navbar">
+            <div class="container">
+                <div class="nav-brand">
+                    <a href="#" class="logo">Your Logo</a>
+                </div>
+                <ul class="nav-menu">
+                    <li><a href="#home">Home</a></li>
+                    <li><a href="#about">About</a></li>
+                    <li><a href="#services">Services</a></li>
+                    <li><a href="#contact">Contact</a></li>
+                </ul>
+                <div class="nav-toggle" id="navToggle">
+                    <span></span>
+                    <span></span>
+                    <span></span>
+                </div>
+            </div>
+        </nav>
+    </header>
+
+    <!-- Main Content -->
+    <main>
+""")
+
+PAGE_END = CompiledTemplate("""
+    </main>
+
+    <!-- Footer -->
+    <footer class="site-footer">
+        <div class="container">
+            <div class="footer-content">
+                <div class="footer-section">
+                    <h3>About</h3>
+                    <p>Footer content here</p>
+                </div>
+                <div class="footer-section">
+                    <h3>Links</h3>
+                    <ul>
+                        <li><a href="#">Link 1</a></li>
+                        <li><a href="#">Link 2</a></li>
+                    </ul>
+                </div>
+                <div class="footer-section">
+                    <h3>Contact</h3>
+                    <p>Contact information</p>
+                </div>
+            </div>
+            <div class="footer-bottom">
+                <p>&copy; 2024 Your Website. All rights reserved.</p>
+            </div>
+        </div>
+    </footer>
+
+    <script src="script.js"></script>
+</body>
+</html>""")
+
+SECTION_START = CompiledTemplate("""
+        <!-- Section ${number} -->
+        <section class="${section_type}" data-height="${height}">
+            <div class="container">
+                <div class="section-content">
+                    <h2>Section ${number} Title</h2>
+                    <p>Replace this with your content based on the screenshot.</p>
+""")
+
+SECTION_END = CompiledTemplate("""                    <!-- Add more content as needed -->
+                </div>
+            </div>
+        </section>
+""")
+
+CALL_TO_ACTION = CompiledTemplate("""                    <a href="#contact" class="btn">${label}</a>
+""")
+
+# nested boxes of the layout tree, one line per box
+BOX_START = CompiledTemplate("""${indent}<div class="${layout}" data-top="${top}" data-height="${height}"${style}>
+""")
+BOX_END = CompiledTemplate("""${indent}</div>
+""")
+BLOCK = CompiledTemplate("""${indent}<div class="block" data-top="${top}" data-height="${height}"></div>
+""")
+
+STYLES = CompiledTemplate("""/* CSS Variables for Color Scheme */
+:root {
+    --primary-color: ${primary_color};
+    --secondary-color: ${secondary_color};
+    --text-color: ${text_color};
+    --bg-color: ${bg_color};
+    --light-gray: #f8f9fa;
+    --border-color: #dee2e6;
+}
+
+/* Reset and Base Styles */
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+    color: var(--text-color);
+    background-color: var(--bg-color);
+    line-height: 1.6;
+}
+
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    padding: 0 20px;
+}
+
+/* Header Styles */
+.site-header {
+    background-color: var(--bg-color);
+    box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+    position: sticky;
+    top: 0;
+    z-index: 1000;
+}
+
+.navbar {
+    padding: 1rem 0;
+}
+
+.navbar .container {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+
+.nav-brand .logo {
+    font-size: 1.5rem;
+    font-weight: bold;
+    color: var(--primary-color);
+    text-decoration: none;
+}
+
+.nav-menu {
+    display: flex;
+    list-style: none;
+    gap: 2rem;
+}
+
+.nav-menu a {
+    color: var(--text-color);
+    text-decoration: none;
+    transition: color 0.3s;
+}
+
+.nav-menu a:hover {
+    color: var(--primary-color);
+}
+
+.nav-toggle {
+    display: none;
+    flex-direction: column;
+    cursor: pointer;
+}
+
+.nav-toggle span {
+    width: 25px;
+    height: 3px;
+    background-color: var(--text-color);
+    margin: 3px 0;
+    transition: 0.3s;
+}
+
+/* Section Styles */
+.hero-section {
+    padding: 4rem 0;
+    background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
+    color: white;
+    text-align: center;
+}
+
+.content-section {
+    padding: 3rem 0;
+    background-color: var(--bg-color);
+}
+
+.feature-section {
+    padding: 3rem 0;
+    background-color: var(--light-gray);
+}
+
+.section-content {
+    padding: 2rem 0;
+}
+
+.section-content h2 {
+    font-size: 2rem;
+    margin-bottom: 1rem;
+    color: var(--primary-color);
+}
+
+.section-content p {
+    font-size: 1.1rem;
+    line-height: 1.8;
+    margin-bottom: 1rem;
+}
+
+/* Grid Layouts */
+.grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+    gap: 2rem;
+    margin-top: 2rem;
+}
+
+.card {
+    background: white;
+    padding: 1.5rem;
+    border-radius: 8px;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+    transition: transform 0.3s, box-shadow 0.3s;
+}
+
+.card:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 5px 20px rgba(0,0,0,0.15);
+}
+
+/* Detected Layout Boxes */
+.layout-rows {
+    display: flex;
+    flex-direction: column;
+    gap: 1rem;
+}
+
+.layout-columns {
+    display: grid;
+    gap: 1rem;
+}
+
+.block {
+    min-height: 1rem;
+    border: 1px dashed var(--border-color);
+    border-radius: 4px;
+}
+
+/* Footer Styles */
+.site-footer {
+    background-color: #2c3e50;
+    color: white;
+    padding: 3rem 0 1rem;
+    margin-top: 3rem;
+}
+
+.footer-content {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+    gap: 2rem;
+    margin-bottom: 2rem;
+}
+
+.footer-section h3 {
+    margin-bottom: 1rem;
+    color: white;
+}
+
+.footer-section ul {
+    list-style: none;
+}
+
+.footer-section a {
+    color: #ecf0f1;
+    text-decoration: none;
+    transition: color 0.3s;
+}
+
+.footer-section a:hover {
+    color: var(--primary-color);
+}
+
+.footer-bottom {
+    text-align: center;
+    padding-top: 2rem;
+    border-top: 1px solid #34495e;
+    color: #95a5a6;
+}
+
+/* Responsive Design */
+@media (max-width: 768px) {
+    .nav-menu {
+        display: none;
+        position: absolute;
+        top: 100%;
+        left: 0;
+        width: 100%;
+        background-color: var(--bg-color);
+        flex-direction: column;
+        padding: 1rem;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+    }
+    
+    .nav-menu.active {
+        display: flex;
+    }
+    
+    .nav-toggle {
+        display: flex;
+    }
+    
+    .grid {
+        grid-template-columns: 1fr;
+    }
+    
+    .footer-content {
+        grid-template-columns: 1fr;
+    }
+}
+
+/* Utility Classes */
+.text-center {
+    text-align: center;
+}
+
+.btn {
+    display: inline-block;
+    padding: 0.75rem 1.5rem;
+    background-color: var(--primary-color);
+    color: white;
+    text-decoration: none;
+    border-radius: 5px;
+    transition: background-color 0.3s, transform 0.3s;
+    border: none;
+    cursor: pointer;
+    font-size: 1rem;
+}
+
+.btn:hover {
+    background-color: var(--secondary-color);
+    transform: translateY(-2px);
+}
+
+.btn-secondary {
+    background-color: var(--secondary-color);
+}
+
+.btn-outline {
+    background-color: transparent;
+    color: var(--primary-color);
+    border: 2px solid var(--primary-color);
+}
+
+.btn-outline:hover {
+    background-color: var(--primary-color);
+    color: white;
+}
+
+/* Additional extracted colors as accent options */
+/* Color Palette: ${palette} */
+""")
+
+SCRIPT = """// Mobile Navigation Toggle
+document.addEventListener('DOMContentLoaded', function() {
+    const navToggle = document.getElementById('navToggle');
+    const navMenu = document.querySelector('.nav-menu');
+    
+    if (navToggle) {
+        navToggle.addEventListener('click', function() {
+            navMenu.classList.toggle('active');
+        });
+    }
+    
+    // Smooth Scrolling
+    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function (e) {
+            e.preventDefault();
+            const target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            }
+        });
+    });
+    
+    // Add any additional JavaScript functionality here
+});"""
+
+DEFAULT_COLORS = ["#007bff", "#6c757d", "#333333", "#ffffff"]
+BOX_INDENT = " " * 20
+
+
+def guess_section_type(index, total_sections):
+    """Guess section type based on position"""
+    if index == 0:
+        return "hero-section"
+    elif index == total_sections - 1:
+        return "cta-section"
+    elif index % 2 == 0:
+        return "feature-section"
+    else:
+        return "content-section"
+
+
+def write_boxes(write, node, indent=BOX_INDENT):
+    """Nested boxes of a layout tree node, each box visited once
+
+    Row splits become stacked .layout-rows, column splits a .layout-columns
+    grid sized by the boxes' widths; leaves are empty .block placeholders.
+    """
+    split = node.get("split")
+    if not split:
+        return
+    style = ""
+    if split == "columns":
+        widths = " ".join(f"{max(1, box['right'] - box['left'])}fr" for box in node["children"])
+        style = f' style="grid-template-columns: {widths}"'
+    BOX_START.render(write, indent=indent, layout="layout-" + split, top=node["top"],
+                     height=node["height"], style=style)
+    inner = indent + "    "
+    for child in node["children"]:
+        if child.get("split"):
+            write_boxes(write, child, inner)
+        else:
+            BLOCK.render(write, indent=inner, top=child["top"], height=child["height"])
+    BOX_END.render(write, indent=indent)
+
+
+def render_section(write, section, number, section_type):
+    """Default renderer: placeholder heading and text, then the section's boxes"""
+    SECTION_START.render(write, number=number, section_type=section_type, height=section["height"])
+    write_boxes(write, section)
+    SECTION_END.render(write)
+
+
+def call_to_action_renderer(label):
+    """Example renderer that adds a .btn link under the placeholder text
+
+    Not registered by default; opt in per section type, e.g. for one converter:
+
+        register_renderer("hero-section", converter.section_renderers)(call_to_action_renderer("Get Started"))
+    """
+    def render(write, section, number, section_type):
+        SECTION_START.render(write, number=number, section_type=section_type, height=section["height"])
+        CALL_TO_ACTION.render(write, label=label)
+        write_boxes(write, section)
+        SECTION_END.render(write)
+    return render
+
+
+# section type -> renderer(write, section, number, section_type); None is the fallback
+SECTION_RENDERERS = {None: render_section}
+
+
+def register_renderer(section_type, renderers=SECTION_RENDERERS):
+    """Decorator registering a section renderer for section_type"""
+    def register(render):
+        renderers[section_type] = render
+        return render
+    return register
+
+
+def write_html(out, sections, renderers=SECTION_RENDERERS, section_type=guess_section_type,
+               title="Cloned Website"):
+    """Stream the page for the detected sections into the file-like out"""
+    write = out.write
+    PAGE_START.render(write, title=title)
+    for i, section in enumerate(sections):
+        kind = section_type(i, len(sections))
+        render = renderers.get(kind) or renderers[None]
+        render(write, section, i + 1, kind)
+    PAGE_END.render(write)
+
+
+def write_css(out, colors):
+    """Stream the stylesheet, with the first four palette colors as the scheme"""
+    scheme = list(colors[:4]) + DEFAULT_COLORS[len(colors[:4]):]
+    STYLES.render(out.write, primary_color=scheme[0], secondary_color=scheme[1], text_color=scheme[2],
+                  bg_color=scheme[3], palette=", ".join(colors))
+
+
+def write_script(out):
+    out.write(SCRIPT)
+
+
+def render_to_string(write_function, *args, **kwargs):
+    """Run one of the write_* functions into a string"""
+    out = io.StringIO()
+    write_function(out, *args, **kwargs)
+    return out.getvalue()
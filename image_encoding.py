@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Screenshot image encoding
+Re-encodes captured PNGs in a background process pool so capture throughput
+isn't blocked: lossless PNG recompression in place, WebP / lossless WebP and,
+when a Pillow AVIF plugin is available, AVIF siblings. Reports size and time
+per format
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+try:
+    import pillow_avif  # registers AVIF with Pillow versions that lack it
+except ImportError:
+    pillow_avif = None
+
+DEFAULT_FORMATS = ["png-optimized", "webp"]
+
+# Workers are started lazily, from whichever capture thread submits first, so
+# they must not be forked from the threaded parent (locks held by other threads
+# would be copied in their locked state)
+START_METHODS = ("forkserver", "spawn")
+
+# format name -> (file extension or None to rewrite the PNG in place, Pillow save arguments)
+ENCODERS = {
+    "png-optimized": (None, {"format": "PNG", "optimize": True}),
+    "webp": (".webp", {"format": "WEBP", "quality": 90, "method": 4}),
+    "webp-lossless": (".lossless.webp", {"format": "WEBP", "lossless": True, "quality": 100, "method": 4}),
+    "avif": (".avif", {"format": "AVIF", "quality": 70, "speed": 6}),
+}
+
+
+def available_formats():
+    """Encoders this Pillow build can run"""
+    extensions = Image.registered_extensions()
+    return [name for name, (ext, options) in ENCODERS.items()
+            if ext is None or "." + options["format"].lower() in extensions]
+
+
+def encode_file(path, fmt):
+    """Encode one PNG; runs in a worker process and returns a result dict"""
+    start = time.perf_counter()
+    ext, options = ENCODERS[fmt]
+    original_size = os.path.getsize(path)
+    with Image.open(path) as image:
+        image.load()
+        buffer = io.BytesIO()
+        image.save(buffer, **options)
+    data = buffer.getvalue()
+
+    if ext is None:
+        # lossless rewrite of the PNG itself, only if it's actually smaller
+        output = path
+        if len(data) >= original_size:
+            data_size = original_size
+        else:
+            data_size = len(data)
+            write_atomic(path, data)
+    else:
+        output = os.path.splitext(path)[0] + ext
+        data_size = len(data)
+        write_atomic(output, data)
+
+    return {
+        "path": path,
+        "format": fmt,
+        "output": output,
+        "original_bytes": original_size,
+        "bytes": data_size,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def encode_all(path, formats):
+    return [encode_file(path, fmt) for fmt in formats]
+
+
+def write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def worker_context():
+    """multiprocessing context for the encoding workers: the first safe start method available"""
+    available = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(next(method for method in START_METHODS if method in available))
+
+
+class EncodingPool:
+    """Background process pool that encodes submitted PNGs into each format
+
+    Safe to share between threads (batch_capture's capture workers all submit
+    to one pool).
+    """
+
+    def __init__(self, formats=DEFAULT_FORMATS, workers=None):
+        unavailable = [fmt for fmt in formats if fmt not in available_formats()]
+        if unavailable:
+            raise ValueError(f"unsupported image formats: {', '.join(unavailable)}")
+        # in-place PNG rewrites go last so the other encoders read the original
+        self.formats = sorted(formats, key=lambda fmt: ENCODERS[fmt][0] is None)
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context())
+        self.pending = []
+        self.results = []
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def submit(self, path):
+        """Queue path for every format; returns immediately"""
+        # one job per file, so the PNG isn't rewritten while another format reads it
+        future = self.executor.submit(encode_all, path, self.formats)
+        with self._lock:
+            self.pending.append(future)
+            self._collect()
+
+    def _collect(self):
+        """Move results of finished futures out of pending; call with the lock held"""
+        for future in [future for future in self.pending if future.done()]:
+            self.pending.remove(future)
+            try:
+                self.results.extend(future.result())
+            except Exception as e:
+                self.errors.append(str(e))
+
+    def close(self):
+        """Wait for queued work and shut the pool down; returns the report"""
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            self._collect()
+        return self.report()
+
+    def report(self):
+        """Per format: files, bytes before/after and CPU seconds spent"""
+        totals = defaultdict(lambda: {"files": 0, "original_bytes": 0, "bytes": 0, "seconds": 0.0})
+        with self._lock:
+            results = list(self.results)
+        for result in results:
+            total = totals[result["format"]]
+            total["files"] += 1
+            total["original_bytes"] += result["original_bytes"]
+            total["bytes"] += result["bytes"]
+            total["seconds"] += result["seconds"]
+        return dict(totals)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def print_report(report):
+    print(f"  {'format':<15} {'files':>6} {'original':>11} {'encoded':>11} {'saved':>7} {'cpu time':>9}")
+    for fmt, total in report.items():
+        saved = 1 - total["bytes"] / total["original_bytes"] if total["original_bytes"] else 0
+        print(f"  {fmt:<15} {total['files']:>6} {total['original_bytes'] / 1024:>9.0f}KB "
+              f"{total['bytes'] / 1024:>9.0f}KB {saved:>6.0%} {total['seconds']:>8.2f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Re-encode captured PNG screenshots")
+    parser.add_argument("directory", help="capture output directory, searched recursively for PNGs")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS),
+                        help=f"comma-separated, from {', '.join(ENCODERS)} (default: {','.join(DEFAULT_FORMATS)})")
+    parser.add_argument("--workers", type=int, help="encoder processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    args.formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    for fmt in args.formats:
+        if fmt not in ENCODERS:
+            parser.error(f"unknown format: {fmt}")
+        if fmt not in available_formats():
+            parser.error(f"{fmt} needs a Pillow AVIF plugin (pip install pillow-avif-plugin)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = [os.path.join(root, name) for root, _, files in os.walk(args.directory)
+             for name in files if name.lower().endswith(".png")]
+    print(f"🗜️  Encoding {len(paths)} PNGs from {args.directory} as {', '.join(args.formats)}\n")
+
+    start = time.perf_counter()
+    with EncodingPool(args.formats, args.workers) as pool:
+        for path in paths:
+            pool.submit(path)
+    print_report(pool.report())
+    for error in pool.errors:
+        print(f"❌ {error}")
+    print(f"\n⏱️  {time.perf_counter() - start:.2f}s wall time")
+
+
+if __name__ == "__main__":
+    main()
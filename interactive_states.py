@@ -0,0 +1,180 @@
+"""
+Interactive state capture
+Captures hover and focus states of buttons, links and selects cropped to each
+element's bounds through CDP clipped screenshots. Resting states for every
+element are cropped from a single full-page capture, and a state that looks
+the same as the resting element isn't stored
+"""
+
+import base64
+import io
+import math
+import time
+
+import numpy as np
+from PIL import Image
+
+MAX_PER_KIND = 20
+PADDING = 8              # px around the element, for outlines and shadows
+DIFF_TOLERANCE = 16      # per-channel difference that counts as a changed pixel
+DIFF_MIN_FRACTION = 0.001
+STATES = {
+    "button": ["hover", "focus"],
+    "link": ["hover", "focus"],
+    "select": ["hover", "focus"],
+}
+
+# One round trip for every candidate and its document-space rect
+ELEMENTS_SCRIPT = """
+const limit = arguments[0];
+const selectors = {
+    button: 'button, input[type=submit], input[type=button], [role=button]',
+    link: 'a[href]',
+    select: 'select'
+};
+const found = [];
+for (const [kind, selector] of Object.entries(selectors)) {
+    let count = 0;
+    for (const el of document.querySelectorAll(selector)) {
+        if (count >= limit) break;
+        if (kind === 'link' && el.matches(selectors.button)) continue;
+        const r = el.getBoundingClientRect();
+        const s = getComputedStyle(el);
+        if (r.width < 2 || r.height < 2 || s.visibility === 'hidden' || s.opacity === '0') continue;
+        found.push({
+            kind: kind,
+            index: count++,
+            element: el,
+            label: (el.innerText || el.value || el.getAttribute('aria-label') || '').trim().slice(0, 60),
+            rect: {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height}
+        });
+    }
+}
+return found;
+"""
+
+# Bring the element into view and return its rect in viewport and document space
+VIEW_SCRIPT = """
+const el = arguments[0];
+el.scrollIntoView({block: 'center', inline: 'center'});
+const r = el.getBoundingClientRect();
+return {x: r.left, y: r.top, width: r.width, height: r.height, scrollX: window.scrollX, scrollY: window.scrollY};
+"""
+
+
+def padded_clip(x, y, width, height, page_width, page_height):
+    """Element rect grown by PADDING and clamped to the page, as a CDP clip"""
+    left = max(math.floor(x - PADDING), 0)
+    top = max(math.floor(y - PADDING), 0)
+    right = min(math.ceil(x + width + PADDING), page_width)
+    bottom = min(math.ceil(y + height + PADDING), page_height)
+    return {"x": left, "y": top, "width": max(right - left, 1), "height": max(bottom - top, 1), "scale": 1}
+
+
+def capture_clip(driver, clip, beyond_viewport=False):
+    result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+        "format": "png",
+        "captureBeyondViewport": beyond_viewport,
+        "clip": clip,
+    })
+    return base64.b64decode(result["data"])
+
+
+def decode(png):
+    return np.asarray(Image.open(io.BytesIO(png)).convert("RGB"))
+
+
+def encode(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def looks_identical(a, b):
+    """True if two crops differ in fewer than DIFF_MIN_FRACTION of their pixels"""
+    if a.shape != b.shape:
+        return False
+    changed = (np.abs(a.astype(np.int16) - b.astype(np.int16)) > DIFF_TOLERANCE).any(axis=-1)
+    return changed.mean() < DIFF_MIN_FRACTION
+
+
+class StateCapture:
+    """Capture interactive states for the page loaded in driver
+
+    wait(step) is called after each state change and save(path, png) stores a
+    crop; both come from WebsiteScreenshotCapture.
+    """
+
+    def __init__(self, driver, output_dir, wait, save, limit=MAX_PER_KIND):
+        self.driver = driver
+        self.output_dir = output_dir
+        self.wait = wait
+        self.save = save
+        self.limit = limit
+
+    def run(self):
+        """Capture every element's states; returns the per-element records and stats"""
+        start = time.perf_counter()
+        driver = self.driver
+        driver.execute_script("window.scrollTo(0, 0);")
+        targets = driver.execute_script(ELEMENTS_SCRIPT, self.limit)
+
+        # every resting state comes from this one capture
+        metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+        content = metrics.get("cssContentSize") or metrics["contentSize"]
+        page_width, page_height = math.ceil(content["width"]), math.ceil(content["height"])
+        page = decode(capture_clip(driver, {"x": 0, "y": 0, "width": page_width, "height": page_height, "scale": 1},
+                                   beyond_viewport=True))
+        scale = page.shape[1] / page_width
+
+        records = []
+        stats = {"elements": len(targets), "captured": 0, "stored": 0, "identical": 0, "failed": 0}
+        for target in targets:
+            name = f"{target['kind']}_{target['index']}"
+            clip = padded_clip(page_width=page_width, page_height=page_height, **target["rect"])
+            resting = page[round(clip["y"] * scale):round((clip["y"] + clip["height"]) * scale),
+                           round(clip["x"] * scale):round((clip["x"] + clip["width"]) * scale)]
+            record = {"kind": target["kind"], "label": target["label"], "rect": target["rect"],
+                      "rest": f"{name}_rest.png", "states": {}}
+            self.save(f"{self.output_dir}/{record['rest']}", encode(resting))
+
+            for state in STATES[target["kind"]]:
+                try:
+                    png = self.capture_state(target["element"], state, page_width, page_height)
+                except Exception:
+                    stats["failed"] += 1
+                    continue
+                stats["captured"] += 1
+                pixels = decode(png)
+                if looks_identical(pixels, resting):
+                    stats["identical"] += 1
+                    record["states"][state] = None
+                    continue
+                record["states"][state] = f"{name}_{state}.png"
+                self.save(f"{self.output_dir}/{record['states'][state]}", png)
+                stats["stored"] += 1
+            records.append(record)
+
+        stats["seconds"] = time.perf_counter() - start
+        return records, stats
+
+    def capture_state(self, element, state, page_width, page_height):
+        """Put element into state, capture its clip, then undo the state"""
+        driver = self.driver
+        view = driver.execute_script(VIEW_SCRIPT, element)
+        center_x = view["x"] + view["width"] / 2
+        center_y = view["y"] + view["height"] / 2
+        if state == "hover":
+            driver.execute_cdp_cmd("Input.dispatchMouseEvent", {"type": "mouseMoved", "x": center_x, "y": center_y})
+        else:
+            driver.execute_script("arguments[0].focus({preventScroll: true});", element)
+        try:
+            self.wait(state)
+            clip = padded_clip(view["x"] + view["scrollX"], view["y"] + view["scrollY"], view["width"],
+                               view["height"], page_width, page_height)
+            return capture_clip(driver, clip)
+        finally:
+            if state == "hover":
+                driver.execute_cdp_cmd("Input.dispatchMouseEvent", {"type": "mouseMoved", "x": 0, "y": 0})
+            else:
+                driver.execute_script("arguments[0].blur();", element)
@@ -0,0 +1,151 @@
+"""
+Layout segmentation for ScreenshotToHTML
+Recursive XY-cut over a grayscale screenshot. A box is split at runs of
+uniform rows (or columns) wide enough to be gaps, and wherever the color
+changes across the whole line at once (a new background band, a hero image
+directly below the header). Works the same on light and dark pages, since
+uniform means "low spread", not "bright". Everything per row/column is NumPy
+"""
+
+import numpy as np
+
+UNIFORM_TOLERANCE = 10    # max-min gray spread for a row/column to count as background
+EDGE_CHANGE = 12          # gray difference between adjacent rows that counts as a color change
+EDGE_COVERAGE = 0.9       # share of a row that has to change for a full-width edge (new band)
+MIN_GAP = {"rows": 12, "columns": 24}   # px of background needed to split
+GAP_RATIO = 0.5           # only gaps at least this share of the box's widest gap split at a level
+MIN_BOX = 16              # px, boxes smaller than this aren't split further
+MAX_DEPTH = 6
+TARGET_COLUMNS = 480      # columns are averaged down to about this many
+
+
+def grayscale_array(image):
+    """Grayscale uint8 array with the width reduced to ~TARGET_COLUMNS; returns (array, x scale)"""
+    factor = max(1, image.width // TARGET_COLUMNS)
+    gray = image.convert("L")
+    if factor > 1:
+        gray = gray.reduce((factor, 1))
+    return np.asarray(gray), factor
+
+
+def runs(mask):
+    """(start, end) pairs of the True runs in a boolean vector"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+
+def line_stats(lines, previous=None):
+    """Per-line background flags and full-width edge flags for a 2D array of lines
+
+    edges[i] says line i differs from the line before it; pass the last line
+    of the previous strip as previous to carry that across strips.
+    """
+    uniform = (lines.max(axis=1) - lines.min(axis=1)) <= UNIFORM_TOLERANCE
+    if previous is not None:
+        lines = np.concatenate((previous[None], lines))
+    changed = np.abs(np.diff(lines.astype(np.int16), axis=0)) > EDGE_CHANGE
+    edges = changed.mean(axis=1) >= EDGE_COVERAGE
+    if previous is None:
+        edges = np.concatenate(([False], edges))
+    return uniform, edges
+
+
+def cuts_from_stats(uniform, edges, min_gap):
+    """Split positions from per-line background and edge flags"""
+    length = len(uniform)
+    if length < 2 * MIN_BOX:
+        return []
+    starts, ends = runs(uniform)
+
+    cuts = set()
+    # gaps: background runs that don't touch the box edges (those are margins)
+    inner = (starts > 0) & (ends < length)
+    lengths = ends - starts
+    if inner.any():
+        threshold = max(min_gap, GAP_RATIO * lengths[inner].max())
+        wide = inner & (lengths >= threshold)
+        cuts.update(((starts[wide] + ends[wide]) // 2).tolist())
+
+    # bands: the color changes across (almost) the whole line at once
+    cuts.update(np.flatnonzero(edges).tolist())
+
+    return sorted(cut for cut in cuts if MIN_BOX <= cut <= length - MIN_BOX)
+
+
+def cut_positions(block, axis, min_gap):
+    """Positions along the block's axis where it should be split
+
+    axis="rows" cuts horizontally (between rows), "columns" vertically.
+    """
+    lines = block if axis == "rows" else block.T
+    if len(lines) < 2 * MIN_BOX:
+        return []
+    return cuts_from_stats(*line_stats(lines), min_gap)
+
+
+def min_gap_for(direction, x_scale):
+    """MIN_GAP in array units; columns are reduced by x_scale"""
+    return MIN_GAP[direction] if direction == "rows" else max(1, MIN_GAP[direction] // x_scale)
+
+
+def segment(gray, x_scale=1, max_depth=MAX_DEPTH, axis="rows", y_offset=0, x_offset=0):
+    """Box tree for a grayscale array; x coordinates are scaled back by x_scale
+
+    y_offset and x_offset (in array columns) place an array that is one box of
+    a larger page.
+    """
+    height, width = gray.shape
+
+    def node(top, bottom, left, right, axis, depth):
+        box = {
+            "top": int(top + y_offset),
+            "bottom": int(bottom + y_offset),
+            "left": int((left + x_offset) * x_scale),
+            "right": int((right + x_offset) * x_scale),
+            "height": int(bottom - top),
+            "children": [],
+        }
+        if depth >= max_depth:
+            return box
+        block = gray[top:bottom, left:right]
+        for direction in (axis, "columns" if axis == "rows" else "rows"):
+            cuts = cut_positions(block, direction, min_gap_for(direction, x_scale))
+            if cuts:
+                bounds = [0] + cuts + [len(block) if direction == "rows" else block.shape[1]]
+                following = "columns" if direction == "rows" else "rows"
+                for start, end in zip(bounds, bounds[1:]):
+                    if direction == "rows":
+                        box["children"].append(node(top + start, top + end, left, right, following, depth + 1))
+                    else:
+                        box["children"].append(node(top, bottom, left + start, left + end, following, depth + 1))
+                box["split"] = direction
+                break
+        return box
+
+    return node(0, height, 0, width, axis, 0)
+
+
+def segment_image(image, max_depth=MAX_DEPTH):
+    """Box tree for a PIL image"""
+    gray, x_scale = grayscale_array(image)
+    tree = segment(gray, x_scale, max_depth)
+    tree["right"] = image.width
+    return tree
+
+
+def parameters(max_depth=MAX_DEPTH):
+    """Everything a box tree depends on besides the image, e.g. for cache keys"""
+    return {"uniform_tolerance": UNIFORM_TOLERANCE, "edge_change": EDGE_CHANGE, "edge_coverage": EDGE_COVERAGE,
+            "min_gap": MIN_GAP, "gap_ratio": GAP_RATIO, "min_box": MIN_BOX, "max_depth": max_depth,
+            "target_columns": TARGET_COLUMNS}
+
+
+def top_level_sections(tree):
+    """The page's horizontal bands, as ScreenshotToHTML sections"""
+    if tree.get("split") == "rows":
+        return tree["children"]
+    return [tree]
+
+
+def count_boxes(tree):
+    return 1 + sum(count_boxes(child) for child in tree["children"])
@@ -0,0 +1,98 @@
+"""
+Readiness-driven waiting for screenshot captures
+Replaces fixed time.sleep() waits: returns as soon as the document has loaded,
+the network has gone quiet, web fonts are in, finite animations have finished
+and the layout has stopped changing, or when the timeout runs out
+"""
+
+import time
+from collections import namedtuple
+
+DEFAULT_TIMEOUT = 10.0
+QUIET_PERIOD = 0.3
+POLL_INTERVAL = 0.05
+
+ReadinessResult = namedtuple("ReadinessResult", ["settled", "seconds", "pending"])
+
+# One round trip per poll. Resource timing entries only appear once a request
+# finishes, so "network idle" means no new entries for the quiet period.
+# Infinite animations (spinners, marquees) are ignored, they never settle.
+SNAPSHOT_SCRIPT = """
+const doc = document.documentElement;
+const body = document.body;
+let animations = 0;
+if (document.getAnimations) {
+    for (const animation of document.getAnimations()) {
+        const timing = animation.effect && animation.effect.getComputedTiming();
+        if (animation.playState === 'running' && timing && timing.endTime !== Infinity) {
+            animations++;
+        }
+    }
+}
+let pendingImages = 0;
+for (const img of document.images) {
+    if (!img.complete && img.loading !== 'lazy') {
+        pendingImages++;
+    }
+}
+return {
+    readyState: document.readyState,
+    fonts: document.fonts ? document.fonts.status : 'loaded',
+    resources: performance.getEntriesByType('resource').length,
+    layout: [doc.scrollWidth, doc.scrollHeight, body ? body.getBoundingClientRect().height : 0,
+             document.getElementsByTagName('*').length, window.scrollX, window.scrollY].join(','),
+    animations: animations,
+    pendingImages: pendingImages
+};
+"""
+
+
+def pending_conditions(snapshot, network):
+    """Conditions in a snapshot that still hold the page back"""
+    pending = []
+    if snapshot["readyState"] != "complete":
+        pending.append("document")
+    if snapshot["fonts"] != "loaded":
+        pending.append("fonts")
+    if snapshot["animations"]:
+        pending.append("animations")
+    if network and snapshot["pendingImages"]:
+        pending.append("images")
+    return pending
+
+
+def wait_until_settled(driver, timeout=DEFAULT_TIMEOUT, quiet_period=QUIET_PERIOD, network=True,
+                       poll_interval=POLL_INTERVAL):
+    """Poll the page until it is settled or timeout seconds have passed
+
+    With network=False only fonts, animations and layout are considered,
+    which is what hover and scroll transitions need.
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    last_signature = None
+    stable_since = start
+    pending = ["document"]
+
+    while True:
+        now = time.perf_counter()
+        try:
+            snapshot = driver.execute_script(SNAPSHOT_SCRIPT)
+        except Exception:
+            # navigation in progress can tear down the script context
+            snapshot = None
+
+        if snapshot:
+            signature = (snapshot["resources"] if network else None, snapshot["layout"])
+            if signature != last_signature:
+                last_signature = signature
+                stable_since = now
+            pending = pending_conditions(snapshot, network)
+            if now - stable_since < quiet_period:
+                pending.append("network/layout" if network else "layout")
+            if not pending:
+                return ReadinessResult(True, now - start, [])
+
+        if now >= deadline:
+            return ReadinessResult(False, now - start, pending)
+        time.sleep(poll_interval)
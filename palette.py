@@ -0,0 +1,194 @@
+"""
+Color palette backends for ScreenshotToHTML
+"kmeans", the default, is the original scikit-learn clustering, imported only
+when used. The fast alternatives: "histogram" buckets a frequency-preserving
+pixel sample into a quantized NumPy histogram; "median-cut" and "octree" use
+Pillow's quantizer. These return colors most-used first with near-duplicates
+merged
+"""
+
+import math
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_BACKEND = "kmeans"
+MAX_SAMPLES = 200_000       # pixels looked at, regardless of screenshot size
+HISTOGRAM_BITS = 5          # per channel, 32768 buckets
+CANDIDATE_BUCKETS = 512     # most used buckets considered for the palette
+KMEANS_PIXELS = 150 * 150   # pixels KMeans clusters, the original 150x150 thumbnail
+MIN_DISTANCE = 28.0         # RGB distance under which two colors count as the same
+
+
+def to_hex(color):
+    return "#{:02x}{:02x}{:02x}".format(*(int(round(c)) for c in color[:3]))
+
+
+def from_hex(value):
+    return tuple(int(value[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def sample_pixels(image, max_samples=MAX_SAMPLES):
+    """Evenly spaced pixels as an (n, 3) uint8 array
+
+    A nearest-neighbour resize only touches the pixels it keeps, so this costs
+    the same on a 20000px-tall capture as on a viewport shot, and every area of
+    the page keeps its share of the sample.
+    """
+    width, height = image.size
+    step = max(1.0, math.sqrt(width * height / max_samples))
+    size = (max(1, int(width / step)), max(1, int(height / step)))
+    sample = image.resize(size, Image.NEAREST) if step > 1 else image
+    return np.asarray(sample.convert("RGB")).reshape(-1, 3)
+
+
+def distinct_colors(colors, counts, n_colors, min_distance=MIN_DISTANCE):
+    """Walk colors from most to least used, keeping the ones not close to a kept one"""
+    order = np.argsort(-counts, kind="stable")
+    kept = []
+    for index in order:
+        color = colors[index]
+        if kept and np.min(np.linalg.norm(np.array(kept) - color, axis=1)) < min_distance:
+            continue
+        kept.append(color)
+        if len(kept) == n_colors:
+            break
+    return kept
+
+
+class HistogramAccumulator:
+    """Quantized color histogram that pixels can be added to in batches
+
+    Keeps per-bucket counts and channel sums, a fixed 2**(3*bits) buckets no
+    matter how many pixels go in.
+    """
+
+    def __init__(self, bits=HISTOGRAM_BITS):
+        self.bits = bits
+        size = 1 << (3 * bits)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.sums = np.zeros((size, 3), dtype=np.float64)
+
+    def add(self, pixels):
+        """Count an (n, 3) uint8 array of pixels"""
+        bits = self.bits
+        quantized = (pixels >> (8 - bits)).astype(np.int32)
+        index = (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+        size = len(self.counts)
+        self.counts += np.bincount(index, minlength=size)
+        for c in range(3):
+            self.sums[:, c] += np.bincount(index, weights=pixels[:, c], minlength=size)
+
+    def colors(self, n_colors=10):
+        """Most used distinct colors, as RGB arrays"""
+        occupied = np.flatnonzero(self.counts)
+        if len(occupied) > CANDIDATE_BUCKETS:
+            occupied = occupied[np.argpartition(-self.counts[occupied], CANDIDATE_BUCKETS)[:CANDIDATE_BUCKETS]]
+        counts = self.counts[occupied]
+        # mean of the real pixels in a bucket, not its corner
+        means = self.sums[occupied] / counts[:, None]
+        return distinct_colors(means, counts, n_colors)
+
+
+def histogram_colors(pixels, n_colors=10):
+    histogram = HistogramAccumulator()
+    histogram.add(pixels)
+    return histogram.colors(n_colors)
+
+
+def histogram_palette(image, n_colors=10):
+    return histogram_colors(sample_pixels(image), n_colors)
+
+
+def quantize_colors(pixels, n_colors, method):
+    """Pillow quantizer over a pixel sample; asks for extra colors to merge duplicates"""
+    sample = Image.fromarray(pixels.reshape(1, -1, 3))
+    quantized = sample.quantize(colors=min(256, n_colors * 3), method=method)
+    palette = np.array(quantized.getpalette()[:3 * 256], dtype=np.float64).reshape(-1, 3)
+    counts, indexes = zip(*quantized.getcolors(256))
+    return distinct_colors(palette[list(indexes)], np.array(counts), n_colors)
+
+
+def median_cut_colors(pixels, n_colors=10):
+    return quantize_colors(pixels, n_colors, Image.Quantize.MEDIANCUT)
+
+
+def octree_colors(pixels, n_colors=10):
+    return quantize_colors(pixels, n_colors, Image.Quantize.FASTOCTREE)
+
+
+def median_cut_palette(image, n_colors=10):
+    return median_cut_colors(sample_pixels(image), n_colors)
+
+
+def octree_palette(image, n_colors=10):
+    return octree_colors(sample_pixels(image), n_colors)
+
+
+def kmeans_colors(pixels, n_colors=10):
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=n_colors, random_state=42)
+    kmeans.fit(pixels)
+    # KMeans numbers its clusters arbitrarily; put the largest first
+    order = np.argsort(-np.bincount(kmeans.labels_, minlength=n_colors), kind="stable")
+    return list(kmeans.cluster_centers_[order].astype(int))
+
+
+def kmeans_palette(image, n_colors=10):
+    """The original approach: KMeans on a 150x150 thumbnail"""
+    pixels = np.array(image.convert("RGB").resize((150, 150))).reshape(-1, 3)
+    return kmeans_colors(pixels, n_colors)
+
+
+def kmeans_sample_colors(pixels, n_colors=10):
+    """KMeans on about KMEANS_PIXELS evenly spaced pixels of a larger sample"""
+    step = max(1, len(pixels) // KMEANS_PIXELS)
+    return kmeans_colors(pixels[::step], n_colors)
+
+
+BACKENDS = {
+    "histogram": histogram_palette,
+    "median-cut": median_cut_palette,
+    "octree": octree_palette,
+    "kmeans": kmeans_palette,
+}
+
+# the same backends over an already sampled (n, 3) pixel array, see tiled_analysis
+SAMPLE_BACKENDS = {
+    "histogram": histogram_colors,
+    "median-cut": median_cut_colors,
+    "octree": octree_colors,
+    "kmeans": kmeans_sample_colors,
+}
+
+
+def extract_palette(image, n_colors=10, backend=DEFAULT_BACKEND):
+    """Dominant colors of image as hex strings"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown palette backend: {backend}")
+    return [to_hex(color) for color in BACKENDS[backend](image, n_colors)]
+
+
+def extract_sample_palette(pixels, n_colors=10, backend=DEFAULT_BACKEND):
+    """Dominant colors of a pixel sample (as from sample_pixels) as hex strings"""
+    if backend not in SAMPLE_BACKENDS:
+        raise ValueError(f"Unknown palette backend: {backend}")
+    return [to_hex(color) for color in SAMPLE_BACKENDS[backend](pixels, n_colors)]
+
+
+def parameters(n_colors, backend):
+    """Everything a palette depends on besides the image, e.g. for cache keys"""
+    return {"n_colors": n_colors, "backend": backend, "max_samples": MAX_SAMPLES, "bits": HISTOGRAM_BITS,
+            "candidates": CANDIDATE_BUCKETS, "min_distance": MIN_DISTANCE}
+
+
+def palette_distance(a, b):
+    """Mean RGB distance from each color to the closest one in the other palette
+
+    Symmetric; 0 means the palettes are the same, under ~30 is hard to tell apart.
+    """
+    a = np.array([from_hex(c) for c in a], dtype=np.float64)
+    b = np.array([from_hex(c) for c in b], dtype=np.float64)
+    distances = np.linalg.norm(a[:, None] - b[None], axis=2)
+    return float((distances.min(axis=1).mean() + distances.min(axis=0).mean()) / 2)
@@ -0,0 +1,149 @@
+"""
+Pre-fork process supervisor for the portfolio servers
+Runs N worker processes that each listen on the same port with SO_REUSEPORT,
+so the kernel spreads connections across every core. Dead workers are
+restarted and SIGTERM/SIGINT drain the workers before exiting.
+"""
+
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+RESTART_BACKOFF = 1.0
+SHUTDOWN_TIMEOUT = 10.0
+POLL_INTERVAL = 0.2
+
+
+def prefork_supported():
+    return hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")
+
+
+def bind_reuse_port(server):
+    """Bind and activate a server created with bind_and_activate=False on a SO_REUSEPORT socket"""
+    try:
+        server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server.server_bind()
+        server.server_activate()
+    except:
+        server.server_close()
+        raise
+    return server
+
+
+def run_worker(make_server):
+    """Child process body: serve until SIGTERM/SIGINT, then finish in-flight requests"""
+    server = make_server()
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so it can't run on
+        # the thread that is inside serve_forever
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    with server:
+        server.serve_forever()
+
+
+class PreforkSupervisor:
+    """Fork and babysit a fixed number of server processes"""
+
+    def __init__(self, make_server, processes, restart_backoff=RESTART_BACKOFF,
+                 shutdown_timeout=SHUTDOWN_TIMEOUT):
+        if not prefork_supported():
+            raise RuntimeError("pre-fork mode needs os.fork and SO_REUSEPORT (Linux, macOS, BSD)")
+        self.make_server = make_server
+        self.processes = processes
+        self.restart_backoff = restart_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self.children = {}
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            # drop the supervisor's handlers until the worker installs its own
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            status = 0
+            try:
+                run_worker(self.make_server)
+            except BaseException as e:
+                print(f"❌ Worker {os.getpid()} failed: {e}")
+                status = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(status)
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def request_stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        """Collect exited children without blocking and return [(pid, status, started)]"""
+        exited = []
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                break
+            if pid == 0:
+                break
+            started = self.children.pop(pid, None)
+            if started is not None:
+                exited.append((pid, status, started))
+        return exited
+
+    def run(self):
+        """Start the workers and supervise them until SIGTERM/SIGINT"""
+        # Fail fast in the parent if the address can't be bound at all
+        self.make_server().server_close()
+
+        previous = {sig: signal.signal(sig, self.request_stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for _ in range(self.processes):
+                self.spawn()
+
+            while not self.stopping:
+                for pid, status, started in self.reap():
+                    if self.stopping:
+                        break
+                    lifetime = time.monotonic() - started
+                    print(f"⚠️  Worker {pid} exited ({describe_status(status)}), restarting")
+                    if lifetime < self.restart_backoff:
+                        # don't spin if workers die straight after starting
+                        time.sleep(self.restart_backoff)
+                    self.spawn()
+                time.sleep(POLL_INTERVAL)
+
+            deadline = time.monotonic() + self.shutdown_timeout
+            while self.children and time.monotonic() < deadline:
+                self.reap()
+                time.sleep(POLL_INTERVAL)
+            for pid in list(self.children):
+                print(f"⚠️  Worker {pid} did not stop in time, killing it")
+                os.kill(pid, signal.SIGKILL)
+            while self.children:
+                self.reap()
+                time.sleep(POLL_INTERVAL)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+
+def describe_status(status):
+    if os.WIFSIGNALED(status):
+        return f"signal {os.WTERMSIG(status)}"
+    return f"exit code {os.waitstatus_to_exitcode(status)}"
@@ -63,13 +63,12 @@ def capture_screenshots():
             url = "https://" + url
         
         print(f"\n🔍 Capturing screenshots from: {url}")
-        capture = WebsiteScreenshotCapture(url)
-        
-        print("\n📸 Starting capture process...")
-        capture.capture_full_page()
-        capture.capture_viewport_sections()
-        capture.extract_colors_and_fonts()
-        capture.download_assets()
+        with WebsiteScreenshotCapture(url) as capture:
+            print("\n📸 Starting capture process...")
+            capture.capture_full_page()
+            capture.capture_viewport_sections()
+            capture.extract_colors_and_fonts()
+            capture.download_assets()
         
         print("\n✅ Screenshots captured successfully!")
         print(f"📁 Check the 'screenshots' folder for results")
@@ -115,12 +114,14 @@ def convert_screenshot():
             return False
         
         print(f"\n🔄 Converting: {screenshot_path}")
-        converter = ScreenshotToHTML(screenshot_path)
-        result = converter.convert_to_html()
+        with ScreenshotToHTML(screenshot_path) as converter:
+            result = converter.convert_to_html()
         
         print("\n✅ Conversion complete!")
         print(f"📁 HTML/CSS generated in 'cloned_site' folder")
         print(f"🎨 Extracted colors: {', '.join(result['colors'][:5])}")
+        if converter.cache and converter.cache.hits:
+            print(f"⚡ Reused cached analysis from {converter.cache.cache_dir}/")
         
         return True
         
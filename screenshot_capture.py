@@ -4,25 +4,40 @@ Captures screenshots of websites for cloning purposes
 """
 
 import os
-import time
 import json
-from selenium import webdriver
+import argparse
+import math
+import base64
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
 from PIL import Image
-import requests
-from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse
+
+from asset_downloader import AssetDownloader
+from change_tracker import CaptureManifest
+from driver_pool import DriverPool, default_chrome_options
+from interactive_states import StateCapture
+from page_readiness import wait_until_settled
+from section_stitcher import SectionStitcher
+from style_tokens import extract_style_tokens
+
+# The fixed sleeps the readiness waits replace, used to report time saved
+FIXED_LOAD_WAIT = 2.0
+FIXED_SCROLL_WAIT = 0.5
+FIXED_HOVER_WAIT = 0.5
 
 
 class WebsiteScreenshotCapture:
-    def __init__(self, url, output_dir="screenshots"):
+    def __init__(self, url, output_dir="screenshots", driver_pool=None, ready_timeout=10, incremental=False,
+                 encoder=None):
         self.url = url
         self.output_dir = output_dir
         self.domain = urlparse(url).netloc
+        self.ready_timeout = ready_timeout
+        self.readiness_log = []
+        self.incremental = incremental
+        self.encoder = encoder  # optional image_encoding.EncodingPool
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
@@ -30,27 +45,98 @@ class WebsiteScreenshotCapture:
         os.makedirs(f"{output_dir}/sections", exist_ok=True)
         os.makedirs(f"{output_dir}/mobile", exist_ok=True)
         
+        # Perceptual hashes of earlier screenshots; with incremental,
+        # unchanged ones aren't rewritten
+        self.changes = CaptureManifest(output_dir, incremental)
+        
         # Setup Chrome options
-        self.chrome_options = Options()
-        self.chrome_options.add_argument("--headless")
-        self.chrome_options.add_argument("--no-sandbox")
-        self.chrome_options.add_argument("--disable-dev-shm-usage")
-        self.chrome_options.add_argument("--disable-gpu")
+        self.chrome_options = default_chrome_options()
         
-    def capture_full_page(self, viewport_widths=[1920, 1366, 768, 375]):
-        """Capture full page screenshots at different viewport widths"""
-        driver = webdriver.Chrome(options=self.chrome_options)
+        # Reuse warm browser sessions across capture methods (and across URLs
+        # when a shared pool is passed in)
+        self.owns_pool = driver_pool is None
+        self.driver_pool = driver_pool or DriverPool(self.chrome_options, size=1)
+        
+    def close(self):
+        """Shut down the browser sessions if this capture owns the pool"""
+        if self.owns_pool:
+            self.driver_pool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _load(self, driver, url):
+        """Navigate to url, counting the page load against the session"""
+        driver.get(url)
+        self.driver_pool.count_page(driver)
+    
+    def _wait_ready(self, driver, step, fixed_wait, network=True, quiet_period=0.3):
+        """Wait until the page has settled instead of sleeping fixed_wait seconds"""
+        result = wait_until_settled(driver, timeout=self.ready_timeout, quiet_period=quiet_period,
+                                    network=network)
+        self.readiness_log.append({
+            "step": step,
+            "waited": result.seconds,
+            "saved": fixed_wait - result.seconds,
+            "settled": result.settled,
+        })
+        if network:
+            status = "ready" if result.settled else f"timed out waiting for {', '.join(result.pending)}"
+            print(f"⏱️  Page {status} after {result.seconds:.2f}s "
+                  f"(saved {fixed_wait - result.seconds:.2f}s vs a fixed {fixed_wait:g}s wait)")
+        return result
+    
+    def _save_png(self, path, png):
+        """Save screenshot bytes; returns a note for the log if the file was kept"""
+        return self._saved(path, self.changes.save_png(path, png))
+    
+    def _saved(self, path, written):
+        if written and self.encoder:
+            self.encoder.submit(path)
+        return "" if written else " (unchanged, kept)"
+    
+    def change_report(self):
+        """Which outputs changed since the last capture of this page"""
+        return {
+            "changed": bool(self.changes.changed),
+            "changed_outputs": list(self.changes.changed),
+            "unchanged_outputs": len(self.changes.unchanged),
+        }
+    
+    def readiness_report(self):
+        """Total wait time and time saved against the old fixed sleeps"""
+        return {
+            "waits": len(self.readiness_log),
+            "waited": sum(entry["waited"] for entry in self.readiness_log),
+            "saved": sum(entry["saved"] for entry in self.readiness_log),
+            "timeouts": sum(1 for entry in self.readiness_log if not entry["settled"]),
+        }
+        
+    def capture_full_page(self, viewport_widths=[1920, 1366, 768, 375], single_load=True):
+        """Capture full page screenshots at different viewport widths
+        
+        By default the page is loaded once and each width is captured through
+        the Chrome DevTools Protocol; single_load=False reloads per width.
+        """
+        driver = self.driver_pool.acquire()
         
         try:
+            if single_load and hasattr(driver, "execute_cdp_cmd"):
+                self._capture_full_page_cdp(driver, viewport_widths)
+                return
+            
             for width in viewport_widths:
                 driver.set_window_size(width, 1080)
-                driver.get(self.url)
+                self._load(driver, self.url)
                 
                 # Wait for page to load
                 WebDriverWait(driver, 10).until(
                     EC.presence_of_element_located((By.TAG_NAME, "body"))
                 )
-                time.sleep(2)  # Extra wait for dynamic content
+                self._wait_ready(driver, "full_page", FIXED_LOAD_WAIT)  # Wait for dynamic content
                 
                 # Get full page dimensions
                 total_height = driver.execute_script("return document.body.scrollHeight")
@@ -58,164 +144,206 @@ class WebsiteScreenshotCapture:
                 
                 # Take screenshot
                 screenshot_path = f"{self.output_dir}/full_page/{self.domain}_w{width}.png"
-                driver.save_screenshot(screenshot_path)
-                print(f"Captured full page screenshot at {width}px width: {screenshot_path}")
+                note = self._save_png(screenshot_path, driver.get_screenshot_as_png())
+                print(f"Captured full page screenshot at {width}px width: {screenshot_path}{note}")
                 
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
     
-    def capture_viewport_sections(self, section_height=800):
-        """Capture screenshots of viewport sections while scrolling"""
-        driver = webdriver.Chrome(options=self.chrome_options)
+    def _capture_full_page_cdp(self, driver, viewport_widths):
+        """Load once, then emulate each width and capture beyond the viewport"""
+        self._load(driver, self.url)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        self._wait_ready(driver, "full_page", FIXED_LOAD_WAIT)
+        
+        try:
+            for width in viewport_widths:
+                driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                    "width": width,
+                    "height": 1080,
+                    "deviceScaleFactor": 1,
+                    "mobile": width < 768,
+                })
+                # Media queries and responsive images react to the new width;
+                # this replaces a full reload plus the fixed wait
+                self._wait_ready(driver, "viewport", FIXED_LOAD_WAIT, quiet_period=0.1)
+                
+                # Full document size, not just the viewport
+                metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+                content = metrics.get("cssContentSize") or metrics["contentSize"]
+                total_height = math.ceil(content["height"])
+                
+                screenshot = driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": "png",
+                    "captureBeyondViewport": True,
+                    "clip": {"x": 0, "y": 0, "width": width, "height": total_height, "scale": 1},
+                })
+                screenshot_path = f"{self.output_dir}/full_page/{self.domain}_w{width}.png"
+                note = self._save_png(screenshot_path, base64.b64decode(screenshot["data"]))
+                print(f"Captured full page screenshot at {width}px width: {screenshot_path}{note}")
+        finally:
+            driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+    
+    def capture_viewport_sections(self, section_height=800, stitch=True):
+        """Capture screenshots of viewport sections while scrolling
+        
+        With stitch=True the sections are also merged, as they are captured,
+        into full_page/{domain}_stitched.png, which goes through the change
+        tracker like the other screenshots.
+        """
+        driver = self.driver_pool.acquire()
+        stitcher = None
         
         try:
             driver.set_window_size(1920, section_height)
-            driver.get(self.url)
+            self._load(driver, self.url)
             
             # Wait for page to load
             WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            time.sleep(2)
+            self._wait_ready(driver, "sections", FIXED_LOAD_WAIT)
             
             # Get page height
             total_height = driver.execute_script("return document.body.scrollHeight")
             
+            if stitch:
+                step = (section_height - 100) * driver.execute_script("return window.devicePixelRatio || 1")
+                stitched_path = f"{self.output_dir}/full_page/{self.domain}_stitched.png"
+                # streamed next to the previous capture, then kept only if it changed
+                stitcher = SectionStitcher(stitched_path + ".new", expected_step=round(step))
+            
             # Scroll and capture sections
             scroll_position = 0
             section_num = 1
             
             while scroll_position < total_height:
                 driver.execute_script(f"window.scrollTo(0, {scroll_position});")
-                time.sleep(0.5)  # Wait for scroll animation
+                # Wait for scroll animation and anything lazy-loaded into view
+                self._wait_ready(driver, "scroll", FIXED_SCROLL_WAIT, quiet_period=0.1)
                 
                 screenshot_path = f"{self.output_dir}/sections/{self.domain}_section_{section_num}.png"
-                driver.save_screenshot(screenshot_path)
-                print(f"Captured section {section_num}: {screenshot_path}")
+                note = self._save_png(screenshot_path, driver.get_screenshot_as_png())
+                print(f"Captured section {section_num}: {screenshot_path}{note}")
+                if stitcher:
+                    stitcher.add(screenshot_path)
                 
                 scroll_position += section_height - 100  # Overlap slightly
                 section_num += 1
+            
+            if stitcher and stitcher.sections:
+                width, height = stitcher.close()
+                note = self._saved(stitched_path, self.changes.replace_png(stitched_path, stitcher.output_path))
+                print(f"Stitched {stitcher.sections} sections into {stitched_path} ({width}x{height}){note}")
                 
+        except:
+            if stitcher:
+                stitcher.abort()
+            raise
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
     
-    def capture_interactive_states(self):
-        """Capture screenshots of interactive elements (hover states, dropdowns, etc.)"""
-        driver = webdriver.Chrome(options=self.chrome_options)
+    def capture_interactive_states(self, limit=20):
+        """Capture hover and focus states of buttons, links and dropdowns
+        
+        Each state is cropped to the element and only stored if it differs
+        from the resting element; see interactive_states.
+        """
+        driver = self.driver_pool.acquire()
+        states_dir = f"{self.output_dir}/states"
+        os.makedirs(states_dir, exist_ok=True)
         
         try:
             driver.set_window_size(1920, 1080)
-            driver.get(self.url)
+            self._load(driver, self.url)
             
             # Wait for page to load
             WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            time.sleep(2)
-            
-            # Find interactive elements
-            buttons = driver.find_elements(By.TAG_NAME, "button")
-            links = driver.find_elements(By.TAG_NAME, "a")
-            dropdowns = driver.find_elements(By.TAG_NAME, "select")
-            
-            # Capture hover states for buttons
-            actions = ActionChains(driver)
-            for i, button in enumerate(buttons[:5]):  # Limit to first 5 buttons
-                try:
-                    actions.move_to_element(button).perform()
-                    time.sleep(0.5)
-                    screenshot_path = f"{self.output_dir}/sections/button_hover_{i}.png"
-                    driver.save_screenshot(screenshot_path)
-                    print(f"Captured button hover state {i}")
-                except:
-                    pass
+            self._wait_ready(driver, "interactive", FIXED_LOAD_WAIT)
+            
+            wait = lambda state: self._wait_ready(driver, state, FIXED_HOVER_WAIT, network=False, quiet_period=0.1)
+            records, stats = StateCapture(driver, states_dir, wait, self._save_png, limit).run()
+            
+            with open(f"{states_dir}/states.json", "w") as f:
+                json.dump(records, f, indent=2)
+            
+            print(f"Captured {stats['captured']} states of {stats['elements']} elements: "
+                  f"{stats['stored']} stored, {stats['identical']} identical to resting, "
+                  f"{stats['failed']} failed ({stats['seconds']:.1f}s)")
                     
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
     
     def extract_colors_and_fonts(self):
         """Extract color palette and fonts from the website"""
-        driver = webdriver.Chrome(options=self.chrome_options)
+        driver = self.driver_pool.acquire()
         
         try:
-            driver.get(self.url)
+            self._load(driver, self.url)
             WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
-            # Extract colors
-            colors = set()
-            elements = driver.find_elements(By.CSS_SELECTOR, "*")
-            
-            for element in elements[:100]:  # Sample first 100 elements
-                try:
-                    bg_color = element.value_of_css_property("background-color")
-                    text_color = element.value_of_css_property("color")
-                    colors.add(bg_color)
-                    colors.add(text_color)
-                except:
-                    pass
-            
-            # Extract fonts
-            fonts = set()
-            for element in elements[:100]:
-                try:
-                    font_family = element.value_of_css_property("font-family")
-                    if font_family:
-                        fonts.add(font_family)
-                except:
-                    pass
-            
-            # Save style information
+            # One script walks the whole DOM and counts computed styles in the page
+            tokens = extract_style_tokens(driver)
+            
+            # Save style information, most used values first
             style_info = {
-                "colors": list(colors),
-                "fonts": list(fonts),
-                "url": self.url
+                "colors": tokens["colors"],
+                "fonts": tokens["fonts"],
+                "url": self.url,
+                "elements": tokens["rendered"],
+                "tokens": tokens["tokens"]
             }
             
-            with open(f"{self.output_dir}/style_info.json", "w") as f:
+            style_path = f"{self.output_dir}/style_info.json"
+            previous = None
+            if self.incremental and os.path.exists(style_path):
+                with open(style_path) as f:
+                    previous = json.load(f)
+            self.changes.note("style_info.json", style_info != previous)
+            with open(style_path, "w") as f:
                 json.dump(style_info, f, indent=2)
             
-            print(f"Extracted {len(colors)} colors and {len(fonts)} fonts")
+            print(f"Extracted {len(tokens['colors'])} colors and {len(tokens['fonts'])} fonts "
+                  f"from {tokens['rendered']} elements in {tokens['seconds'] * 1000:.0f}ms")
             
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
     
-    def download_assets(self):
-        """Download images and other assets from the website"""
+    def download_assets(self, workers=8):
+        """Download images, stylesheets, fonts and scripts from the website"""
         assets_dir = f"{self.output_dir}/assets"
-        os.makedirs(assets_dir, exist_ok=True)
         
         try:
-            response = requests.get(self.url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Download images
-            images = soup.find_all('img')
-            for i, img in enumerate(images):
-                try:
-                    img_url = img.get('src')
-                    if img_url:
-                        if not img_url.startswith('http'):
-                            img_url = urljoin(self.url, img_url)
-                        
-                        img_response = requests.get(img_url)
-                        file_ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
-                        
-                        with open(f"{assets_dir}/image_{i}{file_ext}", "wb") as f:
-                            f.write(img_response.content)
-                        
-                        print(f"Downloaded image {i}: {img_url}")
-                except Exception as e:
-                    print(f"Failed to download image: {e}")
-                    
+            summary = AssetDownloader(self.url, assets_dir, workers=workers, incremental=self.incremental).run()
+            self.changes.note("assets", summary["unchanged"] != summary["assets"])
+            kinds = ", ".join(f"{count} {kind}" for kind, count in summary["by_kind"].items())
+            print(f"Downloaded {summary['downloaded']} assets ({kinds}), "
+                  f"{summary['duplicates']} duplicates, {summary['unchanged']} unchanged, {summary['failed']} failed, "
+                  f"{summary['bytes'] / 1024:.0f} KB in {summary['elapsed']:.2f}s"
+                  + (f", {summary['skipped_bytes'] / 1024:.0f} KB not modified" if summary["skipped_bytes"] else ""))
         except Exception as e:
             print(f"Failed to download assets: {e}")
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Capture screenshots, styles and assets of a website")
+    parser.add_argument("url", nargs="?", help="website to capture (asked for when omitted)")
+    parser.add_argument("--output", default="screenshots", help="output directory (default: screenshots)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-capture into an existing output, skipping unchanged screenshots and assets (304s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     # Example usage
-    url = input("Enter the website URL to clone: ")
+    url = args.url or input("Enter the website URL to clone: ")
     
     if not url.startswith("http"):
         url = "https://" + url
@@ -223,22 +351,33 @@ def main():
     print(f"\nStarting screenshot capture for: {url}")
     print("-" * 50)
     
-    capture = WebsiteScreenshotCapture(url)
-    
-    print("\n1. Capturing full page screenshots...")
-    capture.capture_full_page()
-    
-    print("\n2. Capturing viewport sections...")
-    capture.capture_viewport_sections()
-    
-    print("\n3. Capturing interactive states...")
-    capture.capture_interactive_states()
-    
-    print("\n4. Extracting colors and fonts...")
-    capture.extract_colors_and_fonts()
-    
-    print("\n5. Downloading assets...")
-    capture.download_assets()
+    # With --incremental, re-runs on the same site only rewrite what changed
+    with WebsiteScreenshotCapture(url, output_dir=args.output, incremental=args.incremental) as capture:
+        print("\n1. Capturing full page screenshots...")
+        capture.capture_full_page()
+        
+        print("\n2. Capturing viewport sections...")
+        capture.capture_viewport_sections()
+        
+        print("\n3. Capturing interactive states...")
+        capture.capture_interactive_states()
+        
+        print("\n4. Extracting colors and fonts...")
+        capture.extract_colors_and_fonts()
+        
+        print("\n5. Downloading assets...")
+        capture.download_assets()
+        
+        report = capture.readiness_report()
+        print(f"\n⏱️  Readiness waits: {report['waited']:.1f}s over {report['waits']} waits, "
+              f"{report['saved']:.1f}s saved vs fixed sleeps")
+        
+        if args.incremental:
+            changes = capture.change_report()
+            if changes["changed"]:
+                print(f"🔄 Changed since last capture: {', '.join(changes['changed_outputs'])}")
+            else:
+                print(f"✔️  Nothing changed since last capture ({changes['unchanged_outputs']} outputs kept)")
     
     print("\n✅ Screenshot capture complete!")
     print(f"Screenshots saved in: {capture.output_dir}/")
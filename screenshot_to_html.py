@@ -4,500 +4,164 @@ Helps convert website screenshots into HTML/CSS code
 """
 
 import os
+import time
 import base64
 from PIL import Image
-import numpy as np
-from sklearn.cluster import KMeans
 import colorsys
 
+from analysis_cache import AnalysisCache, file_digest
+from html_codegen import (SECTION_RENDERERS, guess_section_type, render_to_string, write_css, write_html,
+                          write_script)
+from layout_segmentation import parameters as layout_parameters, segment_image, top_level_sections
+from palette import DEFAULT_BACKEND, extract_palette, parameters as palette_parameters
+from tiled_analysis import TiledAnalysis, can_stream
+
+
+# Screenshots taller than this are analysed strip by strip by default, when
+# their format can be read in strips (PNG captures, PPM)
+TILED_MIN_HEIGHT = 8000
+
 
 class ScreenshotToHTML:
-    def __init__(self, screenshot_path):
+    def __init__(self, screenshot_path, tiled=None, cache=True):
         self.screenshot_path = screenshot_path
-        self.image = Image.open(screenshot_path)
+        self.image = Image.open(screenshot_path)  # lazy, pixels are decoded on first use
         self.width, self.height = self.image.size
-        
-    def extract_color_palette(self, n_colors=10):
-        """Extract dominant colors from screenshot"""
-        # Resize image for faster processing
-        img_small = self.image.resize((150, 150))
-        img_array = np.array(img_small)
-        
-        # Reshape image to be a list of pixels
-        pixels = img_array.reshape(-1, 3)
-        
-        # Use KMeans to find dominant colors
-        kmeans = KMeans(n_clusters=n_colors, random_state=42)
-        kmeans.fit(pixels)
-        
-        # Get colors
-        colors = kmeans.cluster_centers_.astype(int)
-        
-        # Convert to hex
-        hex_colors = []
-        for color in colors:
-            hex_color = '#{:02x}{:02x}{:02x}'.format(color[0], color[1], color[2])
-            hex_colors.append(hex_color)
-        
-        return hex_colors
+        self.layout_tree = None
+        
+        # Strip-by-strip palette and layout analysis keeps memory flat on tall pages
+        if tiled is None:
+            tiled = self.height > TILED_MIN_HEIGHT and can_stream(screenshot_path)
+        self.tiled = TiledAnalysis(screenshot_path) if tiled else None
+        
+        # Palette and layout results are reused for identical screenshots;
+        # pass an AnalysisCache to choose the directory, False to disable
+        self.cache = AnalysisCache() if cache is True else (cache or None)
+        self._image_hash = None
+        
+        # section type -> renderer, see html_codegen.register_renderer
+        self.section_renderers = dict(SECTION_RENDERERS)
+        
+    def close(self):
+        """Release the screenshot and the tiled analysis' files"""
+        self.image.close()
+        if self.tiled:
+            self.tiled.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        
+    def _cached(self, stage, params, compute):
+        """compute() through the analysis cache, when there is one"""
+        if not self.cache:
+            return compute()
+        if self._image_hash is None:
+            self._image_hash = file_digest(self.screenshot_path)
+        return self.cache.cached(self._image_hash, stage, params, compute)
+        
+    def extract_color_palette(self, n_colors=10, backend=DEFAULT_BACKEND):
+        """Extract dominant colors from screenshot, most used first
+        
+        backend is one of palette.BACKENDS; "kmeans" is the original
+        scikit-learn clustering.
+        """
+        tiled = bool(self.tiled)
+        
+        def compute():
+            if tiled:
+                return self.tiled.palette(n_colors, backend)
+            return extract_palette(self.image, n_colors, backend)
+        
+        params = dict(palette_parameters(n_colors, backend), tiled=tiled)
+        return self._cached("palette", params, compute)
     
     def detect_layout_sections(self):
-        """Detect major layout sections in the screenshot"""
-        # Convert to grayscale for edge detection
-        img_gray = self.image.convert('L')
-        img_array = np.array(img_gray)
+        """Detect major layout sections in the screenshot
         
-        # Simple section detection based on horizontal lines
-        sections = []
-        threshold = 240  # Light colors often indicate section boundaries
+        Sections are the page's top-level horizontal bands; each carries its
+        nested boxes under "children" (see layout_segmentation).
+        """
+        tiled = bool(self.tiled)
         
-        # Find rows that are mostly light (potential section boundaries)
-        row_means = np.mean(img_array, axis=1)
-        boundaries = []
+        def compute():
+            if tiled:
+                return self.tiled.layout_tree()
+            return segment_image(self.image)
         
-        for i in range(1, len(row_means)-1):
-            if row_means[i] > threshold and row_means[i-1] <= threshold:
-                boundaries.append(i)
+        params = dict(layout_parameters(), tiled=tiled)
+        self.layout_tree = self._cached("layout", params, compute)
+        sections = top_level_sections(self.layout_tree)
         
-        # Create sections from boundaries
-        if not boundaries:
+        # Nothing to split on: fall back to thirds
+        if len(sections) < 2:
             boundaries = [0, self.height // 3, 2 * self.height // 3, self.height]
-        
-        for i in range(len(boundaries) - 1):
-            sections.append({
+            sections = [{
                 'top': boundaries[i],
                 'bottom': boundaries[i+1],
                 'height': boundaries[i+1] - boundaries[i]
-            })
+            } for i in range(len(boundaries) - 1)]
         
         return sections
     
     def generate_html_structure(self, sections, colors):
         """Generate HTML structure based on detected sections"""
-        html = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Cloned Website</title>
-    <link rel="stylesheet" href="styles.css">
-</head>
-<body>
-    <!-- Header Section -->
-    <header class="site-header">
-        <nav class="navbar">
-            <div class="container">
-                <div class="nav-brand">
-                    <a href="#" class="logo">Your Logo</a>
-                </div>
-                <ul class="nav-menu">
-                    <li><a href="#home">Home</a></li>
-                    <li><a href="#about">About</a></li>
-                    <li><a href="#services">Services</a></li>
-                    <li><a href="#contact">Contact</a></li>
-                </ul>
-                <div class="nav-toggle" id="navToggle">
-                    <span></span>
-                    <span></span>
-                    <span></span>
-                </div>
-            </div>
-        </nav>
-    </header>
-
-    <!-- Main Content -->
-    <main>
-"""
-        
-        # Add sections based on detection
-        for i, section in enumerate(sections):
-            section_class = self._guess_section_type(i, len(sections))
-            html += f"""
-        <!-- Section {i+1} -->
-        <section class="{section_class}" data-height="{section['height']}">
-            <div class="container">
-                <div class="section-content">
-                    <h2>Section {i+1} Title</h2>
-                    <p>Replace this with your content based on the screenshot.</p>
-                    <!-- Add more content as needed -->
-                </div>
-            </div>
-        </section>
-"""
-        
-        html += """
-    </main>
-
-    <!-- Footer -->
-    <footer class="site-footer">
-        <div class="container">
-            <div class="footer-content">
-                <div class="footer-section">
-                    <h3>About</h3>
-                    <p>Footer content here</p>
-                </div>
-                <div class="footer-section">
-                    <h3>Links</h3>
-                    <ul>
-                        <li><a href="#">Link 1</a></li>
-                        <li><a href="#">Link 2</a></li>
-                    </ul>
-                </div>
-                <div class="footer-section">
-                    <h3>Contact</h3>
-                    <p>Contact information</p>
-                </div>
-            </div>
-            <div class="footer-bottom">
-                <p>&copy; 2024 Your Website. All rights reserved.</p>
-            </div>
-        </div>
-    </footer>
-
-    <script src="script.js"></script>
-</body>
-</html>"""
-        
-        return html
+        return render_to_string(write_html, sections, self.section_renderers, self._guess_section_type)
     
     def generate_css_styles(self, colors):
         """Generate CSS based on extracted colors"""
-        primary_color = colors[0] if colors else "#007bff"
-        secondary_color = colors[1] if len(colors) > 1 else "#6c757d"
-        text_color = colors[2] if len(colors) > 2 else "#333333"
-        bg_color = colors[3] if len(colors) > 3 else "#ffffff"
-        
-        css = f"""/* CSS Variables for Color Scheme */
-:root {{
-    --primary-color: {primary_color};
-    --secondary-color: {secondary_color};
-    --text-color: {text_color};
-    --bg-color: {bg_color};
-    --light-gray: #f8f9fa;
-    --border-color: #dee2e6;
-}}
-
-/* Reset and Base Styles */
-* {{
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-}}
-
-body {{
-    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-    color: var(--text-color);
-    background-color: var(--bg-color);
-    line-height: 1.6;
-}}
-
-.container {{
-    max-width: 1200px;
-    margin: 0 auto;
-    padding: 0 20px;
-}}
-
-/* Header Styles */
-.site-header {{
-    background-color: var(--bg-color);
-    box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-    position: sticky;
-    top: 0;
-    z-index: 1000;
-}}
-
-.navbar {{
-    padding: 1rem 0;
-}}
-
-.navbar .container {{
-    display: flex;
-    justify-content: space-between;
-    align-items: center;
-}}
-
-.nav-brand .logo {{
-    font-size: 1.5rem;
-    font-weight: bold;
-    color: var(--primary-color);
-    text-decoration: none;
-}}
-
-.nav-menu {{
-    display: flex;
-    list-style: none;
-    gap: 2rem;
-}}
-
-.nav-menu a {{
-    color: var(--text-color);
-    text-decoration: none;
-    transition: color 0.3s;
-}}
-
-.nav-menu a:hover {{
-    color: var(--primary-color);
-}}
-
-.nav-toggle {{
-    display: none;
-    flex-direction: column;
-    cursor: pointer;
-}}
-
-.nav-toggle span {{
-    width: 25px;
-    height: 3px;
-    background-color: var(--text-color);
-    margin: 3px 0;
-    transition: 0.3s;
-}}
-
-/* Section Styles */
-.hero-section {{
-    padding: 4rem 0;
-    background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-    color: white;
-    text-align: center;
-}}
-
-.content-section {{
-    padding: 3rem 0;
-    background-color: var(--bg-color);
-}}
-
-.feature-section {{
-    padding: 3rem 0;
-    background-color: var(--light-gray);
-}}
-
-.section-content {{
-    padding: 2rem 0;
-}}
-
-.section-content h2 {{
-    font-size: 2rem;
-    margin-bottom: 1rem;
-    color: var(--primary-color);
-}}
-
-.section-content p {{
-    font-size: 1.1rem;
-    line-height: 1.8;
-    margin-bottom: 1rem;
-}}
-
-/* Grid Layouts */
-.grid {{
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-    gap: 2rem;
-    margin-top: 2rem;
-}}
-
-.card {{
-    background: white;
-    padding: 1.5rem;
-    border-radius: 8px;
-    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-    transition: transform 0.3s, box-shadow 0.3s;
-}}
-
-.card:hover {{
-    transform: translateY(-5px);
-    box-shadow: 0 5px 20px rgba(0,0,0,0.15);
-}}
-
-/* Footer Styles */
-.site-footer {{
-    background-color: #2c3e50;
-    color: white;
-    padding: 3rem 0 1rem;
-    margin-top: 3rem;
-}}
-
-.footer-content {{
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-    gap: 2rem;
-    margin-bottom: 2rem;
-}}
-
-.footer-section h3 {{
-    margin-bottom: 1rem;
-    color: white;
-}}
-
-.footer-section ul {{
-    list-style: none;
-}}
-
-.footer-section a {{
-    color: #ecf0f1;
-    text-decoration: none;
-    transition: color 0.3s;
-}}
-
-.footer-section a:hover {{
-    color: var(--primary-color);
-}}
-
-.footer-bottom {{
-    text-align: center;
-    padding-top: 2rem;
-    border-top: 1px solid #34495e;
-    color: #95a5a6;
-}}
-
-/* Responsive Design */
-@media (max-width: 768px) {{
-    .nav-menu {{
-        display: none;
-        position: absolute;
-        top: 100%;
-        left: 0;
-        width: 100%;
-        background-color: var(--bg-color);
-        flex-direction: column;
-        padding: 1rem;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-    }}
-    
-    .nav-menu.active {{
-        display: flex;
-    }}
-    
-    .nav-toggle {{
-        display: flex;
-    }}
-    
-    .grid {{
-        grid-template-columns: 1fr;
-    }}
-    
-    .footer-content {{
-        grid-template-columns: 1fr;
-    }}
-}}
-
-/* Utility Classes */
-.text-center {{
-    text-align: center;
-}}
-
-.btn {{
-    display: inline-block;
-    padding: 0.75rem 1.5rem;
-    background-color: var(--primary-color);
-    color: white;
-    text-decoration: none;
-    border-radius: 5px;
-    transition: background-color 0.3s, transform 0.3s;
-    border: none;
-    cursor: pointer;
-    font-size: 1rem;
-}}
-
-.btn:hover {{
-    background-color: var(--secondary-color);
-    transform: translateY(-2px);
-}}
-
-.btn-secondary {{
-    background-color: var(--secondary-color);
-}}
-
-.btn-outline {{
-    background-color: transparent;
-    color: var(--primary-color);
-    border: 2px solid var(--primary-color);
-}}
-
-.btn-outline:hover {{
-    background-color: var(--primary-color);
-    color: white;
-}}
-
-/* Additional extracted colors as accent options */
-/* Color Palette: {', '.join(colors)} */
-"""
-        
-        return css
+        return render_to_string(write_css, colors)
     
     def _guess_section_type(self, index, total_sections):
         """Guess section type based on position"""
-        if index == 0:
-            return "hero-section"
-        elif index == total_sections - 1:
-            return "cta-section"
-        elif index % 2 == 0:
-            return "feature-section"
-        else:
-            return "content-section"
+        return guess_section_type(index, total_sections)
     
-    def convert_to_html(self, output_dir="cloned_site"):
-        """Main conversion method"""
+    def convert_to_html(self, output_dir="cloned_site", verbose=True, palette_backend=DEFAULT_BACKEND):
+        """Main conversion method
+        
+        palette_backend picks the palette.BACKENDS entry ("histogram" is much
+        faster than the default KMeans). The result includes per-stage timings
+        in seconds (palette, segmentation, codegen).
+        """
+        log = print if verbose else (lambda *args: None)
         os.makedirs(output_dir, exist_ok=True)
+        timings = {}
         
-        print("Extracting color palette...")
-        colors = self.extract_color_palette()
+        log("Extracting color palette...")
+        start = time.perf_counter()
+        colors = self.extract_color_palette(backend=palette_backend)
+        timings['palette'] = time.perf_counter() - start
         
-        print("Detecting layout sections...")
+        log("Detecting layout sections...")
+        start = time.perf_counter()
         sections = self.detect_layout_sections()
+        timings['segmentation'] = time.perf_counter() - start
         
-        print("Generating HTML structure...")
-        html = self.generate_html_structure(sections, colors)
-        
-        print("Generating CSS styles...")
-        css = self.generate_css_styles(colors)
-        
-        # Save files
+        # Pages are streamed into the files, never held as one string
+        log("Generating HTML structure...")
+        start = time.perf_counter()
         with open(f"{output_dir}/index.html", "w") as f:
-            f.write(html)
+            write_html(f, sections, self.section_renderers, self._guess_section_type)
         
+        log("Generating CSS styles...")
         with open(f"{output_dir}/styles.css", "w") as f:
-            f.write(css)
-        
-        # Generate JavaScript
-        js = """// Mobile Navigation Toggle
-document.addEventListener('DOMContentLoaded', function() {
-    const navToggle = document.getElementById('navToggle');
-    const navMenu = document.querySelector('.nav-menu');
-    
-    if (navToggle) {
-        navToggle.addEventListener('click', function() {
-            navMenu.classList.toggle('active');
-        });
-    }
-    
-    // Smooth Scrolling
-    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
-        anchor.addEventListener('click', function (e) {
-            e.preventDefault();
-            const target = document.querySelector(this.getAttribute('href'));
-            if (target) {
-                target.scrollIntoView({
-                    behavior: 'smooth',
-                    block: 'start'
-                });
-            }
-        });
-    });
-    
-    // Add any additional JavaScript functionality here
-});"""
+            write_css(f, colors)
         
         with open(f"{output_dir}/script.js", "w") as f:
-            f.write(js)
+            write_script(f)
+        timings['codegen'] = time.perf_counter() - start
         
-        print(f"\n✅ HTML/CSS/JS generated in {output_dir}/")
-        print(f"Extracted colors: {colors}")
-        print(f"Detected {len(sections)} sections")
+        log(f"\n✅ HTML/CSS/JS generated in {output_dir}/")
+        log(f"Extracted colors: {colors}")
+        log(f"Detected {len(sections)} sections")
         
         return {
             'colors': colors,
             'sections': sections,
-            'output_dir': output_dir
+            'output_dir': output_dir,
+            'timings': timings
         }
 
 
@@ -505,8 +169,8 @@ def main():
     screenshot_path = input("Enter path to screenshot: ")
     
     if os.path.exists(screenshot_path):
-        converter = ScreenshotToHTML(screenshot_path)
-        result = converter.convert_to_html()
+        with ScreenshotToHTML(screenshot_path) as converter:
+            result = converter.convert_to_html()
         
         print("\n📝 Next steps:")
         print("1. Open index.html in your browser")
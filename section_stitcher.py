@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Section Stitcher
+Merges overlapping scroll-section screenshots into one tall image as they
+arrive. The real overlap is found by matching rows instead of assuming the
+capture step, fixed/sticky headers are kept only once, and the result is
+written as a streamed PNG so only one section is held in memory at a time
+"""
+
+import argparse
+import glob
+import os
+import re
+import struct
+import zlib
+
+import numpy as np
+from PIL import Image
+
+SIGNATURE_BUCKETS = 32    # columns are averaged into this many buckets per row
+ROW_TOLERANCE = 2.0       # max mean difference per bucket for rows to match
+MATCH_THRESHOLD = 0.98    # share of informative rows that must match
+FALLBACK_THRESHOLD = 0.8  # best partial match still accepted (animations, carousels)
+MIN_INFORMATIVE_ROWS = 2  # rows that differ from their neighbour, needed to trust a match
+MAX_HEADER_FRACTION = 0.4
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+class PNGStreamWriter:
+    """Write an RGB PNG block by block without knowing its height up front
+
+    The IHDR chunk is patched with the final height on close.
+    """
+
+    def __init__(self, path, width, compress_level=6):
+        self.path = path
+        self.width = width
+        self.height = 0
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(PNG_SIGNATURE)
+        self._ihdr_offset = self._file.tell()
+        self._write_ihdr()
+        self._compressor = zlib.compressobj(compress_level)
+
+    def _write_ihdr(self):
+        # 8-bit RGB, no interlacing
+        self._file.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)))
+
+    def write_rows(self, rows):
+        """Append an (n, width, 3) uint8 array of rows"""
+        if not len(rows):
+            return
+        # "Sub" filter: each byte minus the same channel of the pixel to its left
+        filtered = rows.copy()
+        filtered[:, 1:] -= rows[:, :-1]
+        data = np.empty((len(rows), 1 + self.width * 3), dtype=np.uint8)
+        data[:, 0] = 1
+        data[:, 1:] = filtered.reshape(len(rows), -1)
+        compressed = self._compressor.compress(data.tobytes())
+        if compressed:
+            self._file.write(_png_chunk(b"IDAT", compressed))
+        self.height += len(rows)
+
+    def close(self):
+        self._file.write(_png_chunk(b"IDAT", self._compressor.flush()))
+        self._file.write(_png_chunk(b"IEND", b""))
+        self._file.seek(self._ihdr_offset)
+        self._write_ihdr()
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+
+
+def row_signatures(pixels):
+    """Per-row mean colour of column buckets, shape (height, buckets * 3)"""
+    height, width, _ = pixels.shape
+    buckets = min(SIGNATURE_BUCKETS, width)
+    usable = width - width % buckets
+    return (pixels[:, :usable].reshape(height, buckets, -1, 3).mean(axis=2, dtype=np.float32)
+            .reshape(height, -1))
+
+
+def rows_match(a, b):
+    return np.abs(a - b).max(axis=-1) <= ROW_TOLERANCE
+
+
+class SectionStitcher:
+    """Stitch scroll sections, in capture order, into output_path
+
+    expected_step is the scroll distance in pixels between sections if known;
+    it's only used to break ties on pages with long uniform stretches.
+    """
+
+    def __init__(self, output_path, expected_step=None):
+        self.output_path = output_path
+        self.expected_step = expected_step
+        self.header_height = None
+        self.sections = 0
+        self.skipped = 0
+        self.overlaps = []
+        self.size = None
+        self._writer = None
+        self._previous = None  # row signatures of the last section, not its pixels
+
+    def add(self, section):
+        """Add the next section, given as a path or a PIL image"""
+        image = Image.open(section) if isinstance(section, (str, os.PathLike)) else section
+        pixels = np.asarray(image.convert("RGB"))
+        signatures = row_signatures(pixels)
+
+        if self._writer is None:
+            self._writer = PNGStreamWriter(self.output_path, pixels.shape[1])
+            self._writer.write_rows(pixels)
+        else:
+            if pixels.shape[1] != self._writer.width:
+                raise ValueError(f"section width {pixels.shape[1]} != {self._writer.width}")
+            if len(signatures) == len(self._previous) and rows_match(signatures, self._previous).all():
+                # the page didn't scroll any further
+                self.skipped += 1
+                return
+            self._writer.write_rows(pixels[self._new_rows_start(signatures):])
+
+        self._previous = signatures
+        self.sections += 1
+
+    def _detect_header(self, signatures, informative):
+        """Leading rows identical to the previous section: a fixed or sticky header"""
+        limit = int(min(len(signatures), len(self._previous)) * MAX_HEADER_FRACTION)
+        same = rows_match(signatures[:limit], self._previous[:limit])
+        height = limit if same.all() else int(np.argmin(same))
+        # plain background matches too: a header needs some structure of its
+        # own, and it ends at its last edge rather than in the blank below it
+        edges = np.flatnonzero(informative[1:height + 1]) + 1
+        height = int(edges[-1]) if len(edges) > 1 else 0
+        # a header has to repeat in every section, so never let it grow
+        self.header_height = height if self.header_height is None else min(self.header_height, height)
+        return self.header_height
+
+    def _find_step(self, signatures, informative, header):
+        """Scroll distance from the previous section, or None if nothing matches"""
+        previous = self._previous
+        steps = np.arange(1, len(previous) - header)
+        if self.expected_step:
+            steps = steps[np.argsort(np.abs(steps - self.expected_step), kind="stable")]
+
+        best_step, best_score = None, 0.0
+        for step in steps:
+            end = min(len(signatures), len(previous) - step)
+            mask = informative[header:end]
+            if mask.sum() < MIN_INFORMATIVE_ROWS:
+                continue
+            matches = rows_match(signatures[header:end], previous[header + step:end + step])
+            # edges carry the evidence, but every row has to line up too
+            score = min(matches[mask].mean(), matches.mean())
+            if score >= MATCH_THRESHOLD:
+                return int(step)
+            if score > best_score:
+                best_step, best_score = int(step), score
+        return best_step if best_score >= FALLBACK_THRESHOLD else None
+
+    def _new_rows_start(self, signatures):
+        """Index of the first row in this section that isn't in the previous one"""
+        # rows that differ from the row above; uniform stretches match anywhere
+        informative = np.ones(len(signatures), dtype=bool)
+        informative[1:] = ~rows_match(signatures[1:], signatures[:-1])
+        header = self._detect_header(signatures, informative)
+
+        # section row i (below the header) shows row i + step of the previous section
+        step = self._find_step(signatures, informative, header)
+        if step is None:
+            # nothing to match on: trust the capture step, or assume no overlap
+            step = self.expected_step or len(self._previous)
+        overlap = max(len(self._previous) - step, 0)
+        self.overlaps.append(overlap)
+        return min(max(overlap, header), len(signatures))
+
+    def close(self):
+        """Finish the PNG; returns (width, height) of the stitched image"""
+        if self._writer is None:
+            raise ValueError("no sections were added")
+        self._writer.close()
+        self.size = (self._writer.width, self._writer.height)
+        return self.size
+
+    def abort(self):
+        """Discard a partly written image"""
+        if self._writer is not None and self.size is None:
+            self._writer.abort()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.abort()
+        elif self._writer is not None:
+            self.close()
+
+
+def section_number(path):
+    match = re.search(r"_section_(\d+)\.\w+$", path)
+    return int(match.group(1)) if match else 0
+
+
+def stitch_sections(paths, output_path, expected_step=None):
+    """Stitch section files in section-number order; returns the SectionStitcher"""
+    with SectionStitcher(output_path, expected_step) as stitcher:
+        for path in sorted(paths, key=section_number):
+            stitcher.add(path)
+    return stitcher
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stitch overlapping section screenshots into one image")
+    parser.add_argument("sections", nargs="+",
+                        help="section PNGs or a glob like 'screenshots/sections/*_section_*.png'")
+    parser.add_argument("-o", "--output", default="stitched.png", help="output PNG (default: stitched.png)")
+    parser.add_argument("--step", type=int, help="scroll step in pixels between sections, if known")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = [path for pattern in args.sections for path in (glob.glob(pattern) or [pattern])]
+    stitcher = stitch_sections(paths, args.output, args.step)
+    print(f"🧵 Stitched {stitcher.sections} sections ({stitcher.skipped} duplicates skipped), "
+          f"header {stitcher.header_height or 0}px, overlaps {stitcher.overlaps}")
+    print(f"✅ {args.output}: {stitcher.size[0]}x{stitcher.size[1]}")
+
+
+if __name__ == "__main__":
+    main()
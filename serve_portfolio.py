@@ -3,39 +3,187 @@
 Serve the portfolio website locally
 """
 
+import argparse
+import functools
 import http.server
 import socketserver
 import webbrowser
 import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import prefork
+from static_handler import StaticFileHandler
 
 PORT = 3000
 DIRECTORY = "portfolio_clone"
+DEFAULT_WORKERS = 16
+DEFAULT_BACKLOG = 128
+# Seconds a threaded-mode connection may sit idle (or trickle a request in)
+# before its worker gives up on it; also how long server_close() waits
+DEFAULT_TIMEOUT = 5.0
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+class MyHTTPRequestHandler(StaticFileHandler):
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
+        kwargs.setdefault("directory", DIRECTORY)
+        super().__init__(*args, **kwargs)
+
+class ThreadPoolHTTPServer(http.server.HTTPServer):
+    """HTTPServer that hands each accepted connection to a fixed pool of worker threads"""
+
+    allow_reuse_address = True
+
+    # Like ThreadingMixIn: server_close() lets in-flight requests finish,
+    # but only for close_timeout seconds
+    block_on_close = True
+
+    def __init__(self, server_address, RequestHandlerClass, workers=DEFAULT_WORKERS, backlog=DEFAULT_BACKLOG,
+                 bind_and_activate=True, close_timeout=DEFAULT_TIMEOUT):
+        # listen() is called from HTTPServer.__init__, so the backlog must be set first
+        self.request_queue_size = backlog
+        self.workers = workers
+        self.close_timeout = close_timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="portfolio-worker")
+        self._connections = set()   # queued or being served
+        self._connections_lock = threading.Lock()
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections.add(request)
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._connections_lock:
+                self._connections.discard(request)
+
+    def server_close(self):
+        super().server_close()
+        # connections still queued are dropped, in-flight ones get close_timeout
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.block_on_close:
+            deadline = time.monotonic() + self.close_timeout
+            for thread in list(self._pool._threads):
+                thread.join(max(0.0, deadline - time.monotonic()))
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for request in connections:
+            # wakes a worker blocked reading from a client that won't finish
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            request.close()
+
+def create_server(port=PORT, mode="threaded", workers=DEFAULT_WORKERS, backlog=DEFAULT_BACKLOG,
+                  directory=DIRECTORY, reuse_port=False, timeout=DEFAULT_TIMEOUT):
+    """Create the portfolio server for the given serving mode
+
+    With reuse_port the listening socket sets SO_REUSEPORT, so several
+    pre-forked processes can listen on the same port. In threaded mode every
+    connection gets a timeout second read timeout, so idle or slow clients
+    can't hold the fixed pool of workers.
+    """
+    if mode == "single":
+        handler = functools.partial(MyHTTPRequestHandler, directory=directory)
+        server = socketserver.TCPServer(("", port), handler, bind_and_activate=not reuse_port)
+    elif mode == "threaded":
+        handler_class = type("ThreadedRequestHandler", (MyHTTPRequestHandler,), {"timeout": timeout})
+        handler = functools.partial(handler_class, directory=directory)
+        server = ThreadPoolHTTPServer(("", port), handler, workers=workers, backlog=backlog,
+                                      bind_and_activate=not reuse_port, close_timeout=timeout)
+    else:
+        raise ValueError(f"Unknown serving mode: {mode}")
+    if reuse_port:
+        prefork.bind_reuse_port(server)
+    return server
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the portfolio website locally")
+    parser.add_argument("--port", type=int, default=PORT, help=f"port to listen on (default: {PORT})")
+    parser.add_argument("--mode", choices=["threaded", "single"], default="threaded",
+                        help="threaded worker pool (default) or the single-connection TCPServer")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"worker threads in threaded mode (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG,
+                        help=f"listen() accept backlog in threaded mode (default: {DEFAULT_BACKLOG})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"seconds an idle or slow connection may hold a worker in threaded mode "
+                             f"(default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="pre-fork this many server processes sharing the port via SO_REUSEPORT "
+                             "(default: 1, no pre-forking)")
+    parser.add_argument("--directory", default=DIRECTORY,
+                        help=f"directory to serve, e.g. portfolio_dist from build_assets.py --fingerprint "
+                             f"(default: {DIRECTORY})")
+    parser.add_argument("--no-browser", action="store_true", help="don't open a browser window")
+    return parser.parse_args(argv)
+
+def serve_prefork(args):
+    """Run args.processes copies of the server on one port until SIGTERM/Ctrl+C"""
+    make_server = functools.partial(create_server, args.port, args.mode, args.workers, args.backlog,
+                                    args.directory, reuse_port=True, timeout=args.timeout)
+    try:
+        supervisor = prefork.PreforkSupervisor(make_server, args.processes)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return
+
+    url = f"http://localhost:{args.port}"
+    print(f"✅ Server running at: {url}")
+    print(f"📁 Serving files from: {args.directory}/")
+    print(f"🧵 Mode: {args.processes} pre-forked {args.mode} processes")
+    print("\n⌨️  Press Ctrl+C to stop the server")
+    if not args.no_browser:
+        print(f"\n🌐 Opening browser...")
+        webbrowser.open(url)
+
+    supervisor.run()
+    print("\n\n👋 Server stopped. Goodbye!")
+
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     print("=" * 50)
     print("  PORTFOLIO WEBSITE SERVER")
     print("=" * 50)
-    print(f"\n🚀 Starting server on port {PORT}...")
-    
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-        url = f"http://localhost:{PORT}"
+    print(f"\n🚀 Starting server on port {args.port}...")
+
+    if args.processes > 1:
+        serve_prefork(args)
+        return
+
+    with create_server(args.port, args.mode, args.workers, args.backlog, args.directory,
+                       timeout=args.timeout) as httpd:
+        url = f"http://localhost:{args.port}"
         print(f"✅ Server running at: {url}")
-        print(f"📁 Serving files from: {DIRECTORY}/")
+        print(f"📁 Serving files from: {args.directory}/")
+        if args.mode == "threaded":
+            print(f"🧵 Mode: threaded ({args.workers} workers, backlog {args.backlog}, "
+                  f"{args.timeout:g}s timeout)")
+        else:
+            print("🧵 Mode: single connection")
         print("\n📋 Features:")
         print("  • Dark/Light theme toggle (sun icon)")
         print("  • Click email to copy")
         print("  • Interactive project cards")
         print("  • Smooth animations")
         print("\n⌨️  Press Ctrl+C to stop the server")
-        
+
         # Open browser
-        print(f"\n🌐 Opening browser...")
-        webbrowser.open(url)
-        
+        if not args.no_browser:
+            print(f"\n🌐 Opening browser...")
+            webbrowser.open(url)
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
@@ -43,5 +191,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,148 @@
+"""
+Request metrics for the portfolio servers
+Per-path request counts, status codes, bytes sent and latency histograms,
+rendered in the Prometheus text exposition format on /__metrics.
+
+Each handler thread records into its own shard, so the request path never
+takes a lock; shards are only merged when the metrics are scraped, and the
+shards of finished threads (thread-per-connection servers) are folded into
+one retired shard. With serve_portfolio.py --processes every worker keeps
+its own numbers.
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+
+METRICS_PATH = "/__metrics"
+
+# Upper bounds in seconds, Prometheus style (the +Inf bucket is implicit)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Requests that didn't resolve to a file or directory being served (404s,
+# bad requests, 501s for unsupported methods) are folded into one path label
+# so scanners can't blow up the number of series
+UNMATCHED_PATH = "__unmatched__"
+
+# Fold dead threads' shards once this many are registered
+MAX_SHARDS = 256
+
+
+class _Shard:
+    """Counters owned by a single thread"""
+
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.requests = defaultdict(int)  # (path, status) -> count
+        self.bytes = defaultdict(int)  # path -> body bytes
+        self.buckets = {}  # path -> [count per bucket..., +Inf]
+        self.sums = defaultdict(float)  # path -> total seconds
+
+    def merge(self, other):
+        for key, count in list(other.requests.items()):
+            self.requests[key] += count
+        for path, count in list(other.bytes.items()):
+            self.bytes[path] += count
+        for path, counts in list(other.buckets.items()):
+            merged = self.buckets.setdefault(path, [0] * len(counts))
+            for i, count in enumerate(list(counts)):
+                merged[i] += count
+        for path, total in list(other.sums.items()):
+            self.sums[path] += total
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS, prefix="portfolio_http"):
+        self.bucket_bounds = tuple(buckets)
+        self.prefix = prefix
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._shards_lock:
+                self._shards.append(shard)
+                if len(self._shards) > MAX_SHARDS:
+                    self._fold_dead_shards()
+        return shard
+
+    def _fold_dead_shards(self):
+        """Merge shards of finished threads into the retired shard (lock held)"""
+        live = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                live.append(shard)
+            else:
+                self._retired.merge(shard)
+        self._shards = live
+
+    def observe(self, path, status, body_bytes, seconds, matched=True):
+        """Record one finished request; matched=False files it under UNMATCHED_PATH"""
+        if not matched:
+            path = UNMATCHED_PATH
+        shard = self._shard()
+        shard.requests[(path, status)] += 1
+        shard.bytes[path] += body_bytes
+        counts = shard.buckets.get(path)
+        if counts is None:
+            counts = shard.buckets[path] = [0] * (len(self.bucket_bounds) + 1)
+        # le semantics: the first bucket whose bound is >= seconds, else +Inf
+        counts[bisect.bisect_left(self.bucket_bounds, seconds)] += 1
+        shard.sums[path] += seconds
+
+    def snapshot(self):
+        """Merge every thread's shard into (requests, bytes, buckets, sums)"""
+        total = _Shard()
+        with self._shards_lock:
+            self._fold_dead_shards()
+            total.merge(self._retired)
+            shards = list(self._shards)
+        for shard in shards:
+            total.merge(shard)
+        return total.requests, total.bytes, total.buckets, total.sums
+
+    def render(self):
+        """Prometheus text exposition of the current metrics"""
+        requests, sent, buckets, sums = self.snapshot()
+        name = self.prefix
+        lines = [
+            f"# HELP {name}_requests_total Requests served, by path and status code.",
+            f"# TYPE {name}_requests_total counter",
+        ]
+        for (path, status), count in sorted(requests.items()):
+            lines.append(f'{name}_requests_total{{path="{escape_label(path)}",status="{status}"}} {count}')
+
+        lines += [
+            f"# HELP {name}_response_bytes_total Response body bytes sent, by path.",
+            f"# TYPE {name}_response_bytes_total counter",
+        ]
+        for path, count in sorted(sent.items()):
+            lines.append(f'{name}_response_bytes_total{{path="{escape_label(path)}"}} {count}')
+
+        lines += [
+            f"# HELP {name}_request_duration_seconds Time from request line to response sent, by path.",
+            f"# TYPE {name}_request_duration_seconds histogram",
+        ]
+        for path, counts in sorted(buckets.items()):
+            label = escape_label(path)
+            cumulative = 0
+            for bound, count in zip(self.bucket_bounds, counts):
+                cumulative += count
+                lines.append(f'{name}_request_duration_seconds_bucket{{path="{label}",le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{name}_request_duration_seconds_bucket{{path="{label}",le="+Inf"}} {cumulative}')
+            lines.append(f'{name}_request_duration_seconds_sum{{path="{label}"}} {sums[path]:.6f}')
+            lines.append(f'{name}_request_duration_seconds_count{{path="{label}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared by every handler in the process
+REGISTRY = MetricsRegistry()
@@ -4,16 +4,36 @@ Simple HTTP Server for Portfolio
 Uses a different approach with basic HTTP server
 """
 
+import functools
 import os
 import sys
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
 import webbrowser
 import threading
 import time
 
-class CustomHandler(SimpleHTTPRequestHandler):
+from access_log import AccessLogWriter
+from static_handler import StaticFileHandler
+
+DIRECTORY = "portfolio_clone"
+KEEP_ALIVE_TIMEOUT = 5
+MAX_KEEP_ALIVE_REQUESTS = 100
+ACCESS_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "access.log")
+
+class CustomHandler(StaticFileHandler):
+    # Persistent connections: the page's CSS, JS and favicon reuse one socket
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # body waits on a delayed ACK for every response on a reused socket
+    disable_nagle_algorithm = True
+    max_requests_per_connection = MAX_KEEP_ALIVE_REQUESTS
+    # JSON lines written off the request path, echoed to the console
+    access_log = AccessLogWriter(ACCESS_LOG, echo=True)
+
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory="portfolio_clone", **kwargs)
+        kwargs.setdefault("directory", DIRECTORY)
+        super().__init__(*args, **kwargs)
     
     def end_headers(self):
         # Add CORS headers
@@ -22,19 +42,44 @@ class CustomHandler(SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
     
+    def log_request(self, code='-', size='-'):
+        # Requests are logged from request_finished once the response is out
+        pass
+
     def log_message(self, format, *args):
-        # Custom log format
-        print(f"📄 {self.address_string()} - {format % args}")
+        # Errors and other messages go through the access log as well
+        self.log_record({"message": format % args})
+
+    def request_finished(self, seconds):
+        super().request_finished(seconds)
+        headers = getattr(self, "headers", None) or {}
+        self.log_record({
+            "method": self.command,
+            "path": getattr(self, "path", None),
+            "protocol": self.request_version,
+            "status": self.response_status,
+            "bytes": self.body_bytes_sent(),
+            "duration_ms": round(seconds * 1000, 3),
+            "referer": headers.get("Referer"),
+            "user_agent": headers.get("User-Agent"),
+        })
+
+    def log_record(self, record):
+        if self.access_log is None:
+            return
+        record["ts"] = time.time()
+        record["remote"] = self.address_string()
+        self.access_log.log(record)
 
-def start_server():
+def start_server(directory=DIRECTORY):
     PORT = 8080
-    DIRECTORY = "portfolio_clone"
+    handler = functools.partial(CustomHandler, directory=directory)
     
     # Change to the directory containing the portfolio
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    if not os.path.exists(DIRECTORY):
-        print(f"❌ Error: {DIRECTORY} directory not found!")
+    if not os.path.exists(directory):
+        print(f"❌ Error: {directory} directory not found!")
         print(f"Current directory: {os.getcwd()}")
         print(f"Contents: {os.listdir('.')}")
         return
@@ -42,12 +87,12 @@ def start_server():
     print("=" * 60)
     print("  🚀 SIMPLE PORTFOLIO SERVER")
     print("=" * 60)
-    print(f"\n📁 Serving from: {os.path.abspath(DIRECTORY)}")
+    print(f"\n📁 Serving from: {os.path.abspath(directory)}")
     print(f"🌐 URL: http://localhost:{PORT}")
     print(f"📋 Files in directory:")
     
-    for file in os.listdir(DIRECTORY):
-        file_path = os.path.join(DIRECTORY, file)
+    for file in os.listdir(directory):
+        file_path = os.path.join(directory, file)
         if os.path.isfile(file_path):
             size = os.path.getsize(file_path)
             print(f"   • {file} ({size:,} bytes)")
@@ -55,8 +100,9 @@ def start_server():
     print(f"\n✅ Server starting on port {PORT}...")
     
     try:
-        with HTTPServer(("", PORT), CustomHandler) as httpd:
+        with ThreadingHTTPServer(("", PORT), handler) as httpd:
             print(f"🎉 Server running at: http://localhost:{PORT}")
+            print(f"📝 Access log: {ACCESS_LOG}")
             print("⌨️  Press Ctrl+C to stop")
             
             # Open browser after a short delay
@@ -76,13 +122,14 @@ def start_server():
     except OSError as e:
         if e.errno == 10048:  # Port already in use
             print(f"❌ Port {PORT} is already in use. Trying port {PORT + 1}...")
-            start_server_port(PORT + 1)
+            start_server_port(PORT + 1, directory)
         else:
             print(f"❌ Error starting server: {e}")
 
-def start_server_port(port):
+def start_server_port(port, directory=DIRECTORY):
+    handler = functools.partial(CustomHandler, directory=directory)
     try:
-        with HTTPServer(("", port), CustomHandler) as httpd:
+        with ThreadingHTTPServer(("", port), handler) as httpd:
             print(f"🎉 Server running at: http://localhost:{port}")
             print("⌨️  Press Ctrl+C to stop")
             webbrowser.open(f"http://localhost:{port}")
@@ -91,4 +138,5 @@ def start_server_port(port):
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    start_server()
+    # Optional directory argument, e.g. portfolio_dist from build_assets.py --fingerprint
+    start_server(os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else DIRECTORY)
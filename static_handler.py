@@ -0,0 +1,438 @@
+"""
+Static file handler shared by the portfolio servers
+Serves small assets from a bounded in-memory cache with ETag/Last-Modified revalidation,
+picking precompressed .br/.gz siblings from Accept-Encoding and applying a
+Cache-Control policy that lets fingerprinted assets be cached forever
+"""
+
+import datetime
+import email.utils
+import hashlib
+import io
+import os
+import re
+import stat as stat_module
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, namedtuple
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler
+
+import server_metrics
+
+ASSET_CACHE_BYTES = 32 * 1024 * 1024
+ASSET_CACHE_MAX_ENTRY_BYTES = 1024 * 1024
+
+# Text assets worth precompressing, and the sibling suffix for each
+# Content-Encoding in server preference order (see build_assets.py)
+COMPRESSIBLE_EXTENSIONS = {".html", ".htm", ".css", ".js", ".svg", ".json", ".txt", ".xml"}
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Cache-Control policy: first matching path pattern wins. Content-hashed
+# names (styles.<hash>.css, written by build_assets.py --fingerprint) never
+# change, HTML is revalidated after a minute, anything else every time.
+FINGERPRINT_LENGTH = 10
+CACHE_CONTROL_RULES = [
+    (re.compile(r"\.[0-9a-f]{%d}\.[A-Za-z0-9]+$" % FINGERPRINT_LENGTH), "public, max-age=31536000, immutable"),
+    (re.compile(r"\.html?$"), "public, max-age=60"),
+]
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+CachedAsset = namedtuple("CachedAsset", ["body", "etag", "mtime", "size", "mtime_ns"])
+
+
+class AssetCache:
+    """Bounded LRU cache of file contents keyed by filesystem path"""
+
+    def __init__(self, max_bytes=ASSET_CACHE_BYTES, max_entry_bytes=ASSET_CACHE_MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, stat):
+        """Return the CachedAsset for path, reloading it if stat shows the file changed
+
+        Returns None for files that are too large to cache or can't be read.
+        """
+        if stat.st_size > self.max_entry_bytes:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        entry = CachedAsset(
+            body=body,
+            etag='"%s"' % hashlib.sha256(body).hexdigest()[:32],
+            mtime=stat.st_mtime,
+            size=len(body),
+            mtime_ns=stat.st_mtime_ns,
+        )
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old:
+                self.total_bytes -= old.size
+            self._entries[path] = entry
+            self.total_bytes += entry.size
+            while self.total_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+def file_etag(st):
+    """Cheap ETag for uncached files, derived from mtime and size like nginx does"""
+    return '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+
+
+def etag_matches(header, etag):
+    """Weak comparison of an If-None-Match header against a strong ETag"""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def parse_accept_encoding(header):
+    """Parse an Accept-Encoding header into {coding: qvalue}"""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def not_modified_since(header, mtime):
+    """True if an If-Modified-Since header is at or after the file mtime"""
+    try:
+        ims = email.utils.parsedate_to_datetime(header)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        return False
+    if ims.tzinfo is None:
+        ims = ims.replace(tzinfo=datetime.timezone.utc)
+    last_modified = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc)
+    return last_modified.replace(microsecond=0) <= ims
+
+
+class StaticFileHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler that answers from the shared AssetCache
+
+    Files too large to cache are streamed with sendfile(2), and single byte
+    ranges are honoured for both. Subclasses that set protocol_version to
+    HTTP/1.1 get persistent connections, closed after timeout idle seconds
+    or max_requests_per_connection requests. Every request is recorded in
+    the metrics registry, which is served on metrics_path.
+    """
+
+    asset_cache = AssetCache()
+    cache_control_rules = CACHE_CONTROL_RULES
+    default_cache_control = DEFAULT_CACHE_CONTROL
+    use_sendfile = True
+    sendfile_count = None
+    max_requests_per_connection = 100
+    metrics = server_metrics.REGISTRY
+    metrics_path = server_metrics.METRICS_PATH
+
+    def setup(self):
+        super().setup()
+        self.requests_on_connection = 0
+
+    def handle_one_request(self):
+        self.requests_on_connection += 1
+        self.request_started = None
+        self.response_status = None
+        self.response_length = 0
+        self.path_matched = False
+        super().handle_one_request()
+        if self.request_started is not None and self.response_status is not None:
+            self.request_finished(time.perf_counter() - self.request_started)
+
+    def parse_request(self):
+        # the request line has just been read; keep-alive idle time isn't latency
+        self.request_started = time.perf_counter()
+        return super().parse_request()
+
+    def send_response_only(self, code, message=None):
+        self.response_status = code
+        super().send_response_only(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == "content-length":
+            self.response_length = int(value)
+        super().send_header(keyword, value)
+
+    def body_bytes_sent(self):
+        status = self.response_status
+        if self.command == "HEAD" or status < 200 or status in (204, 304):
+            return 0
+        return self.response_length
+
+    def request_finished(self, seconds):
+        """Called once the response has been sent; subclasses can log here too"""
+        if self.metrics:
+            path = urllib.parse.urlsplit(getattr(self, "path", "")).path
+            self.metrics.observe(path, self.response_status, self.body_bytes_sent(), seconds,
+                                 matched=self.path_matched)
+
+    def do_GET(self):
+        if self.metrics and urllib.parse.urlsplit(self.path).path == self.metrics_path:
+            self.send_metrics()
+            return
+        super().do_GET()
+
+    def send_metrics(self):
+        body = self.metrics.render().encode("utf-8")
+        # scrapes aren't traffic; leave them out of the numbers
+        self.request_started = None
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_headers(self):
+        if self.protocol_version >= "HTTP/1.1" and not self.close_connection:
+            if self.requests_on_connection >= self.max_requests_per_connection:
+                self.send_header("Connection", "close")
+            else:
+                keep_alive = f"max={self.max_requests_per_connection - self.requests_on_connection}"
+                if self.timeout:
+                    keep_alive = f"timeout={int(self.timeout)}, {keep_alive}"
+                self.send_header("Keep-Alive", keep_alive)
+        super().end_headers()
+
+    def resolve_file(self):
+        """Map the request path to (path, stat) of a regular file
+
+        Returns (None, None) when the stock handler should deal with the request
+        (directory redirects and listings, missing files).
+        """
+        path = self.translate_path(self.path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None, None
+        if stat_module.S_ISDIR(st.st_mode):
+            if not urllib.parse.urlsplit(self.path).path.endswith("/"):
+                return None, None
+            for index in "index.html", "index.htm":
+                index = os.path.join(path, index)
+                try:
+                    st = os.stat(index)
+                except OSError:
+                    continue
+                if stat_module.S_ISREG(st.st_mode):
+                    return index, st
+            return None, None
+        if path.endswith("/") or not stat_module.S_ISREG(st.st_mode):
+            return None, None
+        return path, st
+
+    def accepted_encodings(self):
+        """Precompressed encodings the client accepts, in server preference order"""
+        header = self.headers.get("Accept-Encoding")
+        if not header:
+            return []
+        codings = parse_accept_encoding(header)
+        wildcard = codings.get("*", 0.0)
+        return [(encoding, suffix) for encoding, suffix in PRECOMPRESSED_ENCODINGS
+                if codings.get(encoding, wildcard) > 0]
+
+    def select_variant(self, path, st):
+        """Pick the best fresh precompressed sibling of path, or (None, path, st)"""
+        if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return None, path, st
+        for encoding, suffix in self.accepted_encodings():
+            try:
+                variant_st = os.stat(path + suffix)
+            except OSError:
+                continue
+            # ignore siblings left over from an older build of the file
+            if variant_st.st_mtime_ns >= st.st_mtime_ns:
+                return encoding, path + suffix, variant_st
+        return None, path, st
+
+    def cache_control(self, path):
+        """Cache-Control value for a file from the first matching policy rule"""
+        for pattern, value in self.cache_control_rules:
+            if pattern.search(path):
+                return value
+        return self.default_cache_control
+
+    def is_not_modified(self, etag, mtime):
+        """Evaluate If-None-Match (preferred) or If-Modified-Since against a representation"""
+        if "If-None-Match" in self.headers:
+            return etag_matches(self.headers["If-None-Match"], etag)
+        if "If-Modified-Since" in self.headers:
+            return not_modified_since(self.headers["If-Modified-Since"], mtime)
+        return False
+
+    def parse_range(self, size, etag, mtime):
+        """Resolve a single-range Range header to (start, end) inclusive
+
+        Returns None to send the whole representation (no Range, a stale
+        If-Range, or a multi-range request) and raises ValueError when the
+        range can't be satisfied.
+        """
+        header = self.headers.get("Range")
+        if not header or not header.startswith("bytes="):
+            return None
+        if_range = self.headers.get("If-Range")
+        if if_range and if_range != etag and if_range != self.date_time_string(mtime):
+            return None
+        spec = header[len("bytes="):].strip()
+        if "," in spec:
+            return None
+        first, sep, last = spec.partition("-")
+        if not sep:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+            else:
+                start = max(0, size - int(last))
+                end = size - 1
+        except ValueError:
+            return None
+        if start > end or start >= size:
+            raise ValueError("unsatisfiable range")
+        return start, min(end, size - 1)
+
+    def open_representation(self, path, st):
+        """Return (body, size, etag, mtime) for the chosen file, cached or streamed
+
+        body is a BytesIO for cached assets and an open file otherwise, so
+        copyfile can hand large files to sendfile.
+        """
+        entry = self.asset_cache.get(path, st)
+        if entry is not None:
+            return io.BytesIO(entry.body), entry.size, entry.etag, entry.mtime
+        f = open(path, "rb")
+        fs = os.fstat(f.fileno())
+        return f, fs.st_size, file_etag(fs), fs.st_mtime
+
+    def send_head(self):
+        self.sendfile_count = None
+        path, st = self.resolve_file()
+        if path is None:
+            # directory redirects and listings are real paths, anything else is a miss
+            self.path_matched = os.path.isdir(self.translate_path(self.path))
+            return super().send_head()
+        self.path_matched = True
+
+        encoding, variant_path, variant_st = self.select_variant(path, st)
+        try:
+            body, size, etag, mtime = self.open_representation(variant_path, variant_st)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        vary = os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+        cache_control = self.cache_control(path)
+
+        try:
+            if self.is_not_modified(etag, mtime):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", self.date_time_string(mtime))
+                self.send_header("Cache-Control", cache_control)
+                if vary:
+                    self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                body.close()
+                return None
+
+            try:
+                byte_range = self.parse_range(size, etag, mtime)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                body.close()
+                return None
+
+            if byte_range:
+                start, end = byte_range
+                length = end - start + 1
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                body.seek(start)
+            else:
+                length = size
+                self.send_response(HTTPStatus.OK)
+            self.send_header("Content-type", self.guess_type(path))
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            if vary:
+                self.send_header("Vary", "Accept-Encoding")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", self.date_time_string(mtime))
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            self.sendfile_count = length
+            return body
+        except:
+            body.close()
+            raise
+
+    def copyfile(self, source, outputfile):
+        """Send file bodies with sendfile(2) where possible, copying through Python otherwise"""
+        count, self.sendfile_count = self.sendfile_count, None
+        if count is None:
+            return super().copyfile(source, outputfile)
+        if isinstance(source, io.BufferedReader) and self.use_sendfile:
+            try:
+                # socket.sendfile uses os.sendfile and falls back to send()
+                # by itself for sockets/files it can't handle
+                self.connection.sendfile(source, source.tell(), count)
+                return
+            except (AttributeError, ValueError, io.UnsupportedOperation):
+                pass
+        while count > 0:
+            chunk = source.read(min(count, COPY_CHUNK_SIZE))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            count -= len(chunk)
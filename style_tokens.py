@@ -0,0 +1,75 @@
+"""
+In-page design token extraction
+Walks every rendered element in a single execute_script call and counts
+computed colors, fonts, sizes, spacing, radii and shadows in the page, instead
+of one WebDriver round trip per element and property
+"""
+
+import time
+from collections import Counter
+
+# Token groups in the order they're reported
+TOKEN_GROUPS = ["text_colors", "background_colors", "border_colors", "fonts", "font_sizes",
+                "font_weights", "line_heights", "spacing", "radii", "shadows"]
+COLOR_GROUPS = ["text_colors", "background_colors", "border_colors"]
+
+# Counting happens in the page so the payload stays small on large DOMs.
+# Defaults that say nothing about the design (no shadow, transparent, 0px)
+# are left out.
+STYLE_SCRIPT = """
+const start = performance.now();
+const skip = new Set(['', 'none', 'normal', 'auto', '0px', 'rgba(0, 0, 0, 0)', 'transparent']);
+const spacing = ['marginTop', 'marginRight', 'marginBottom', 'marginLeft',
+                 'paddingTop', 'paddingRight', 'paddingBottom', 'paddingLeft', 'rowGap', 'columnGap'];
+const counts = {};
+function add(group, value) {
+    if (skip.has(value)) return;
+    const bucket = counts[group] || (counts[group] = {});
+    bucket[value] = (bucket[value] || 0) + 1;
+}
+const elements = document.body ? [document.body, ...document.body.getElementsByTagName('*')] : [];
+let rendered = 0;
+for (const el of elements) {
+    const s = getComputedStyle(el);
+    if (s.display === 'none') continue;
+    rendered++;
+    add('text_colors', s.color);
+    add('background_colors', s.backgroundColor);
+    if (s.borderTopStyle !== 'none' && s.borderTopWidth !== '0px') add('border_colors', s.borderTopColor);
+    add('fonts', s.fontFamily);
+    add('font_sizes', s.fontSize);
+    add('font_weights', s.fontWeight);
+    add('line_heights', s.lineHeight);
+    for (const side of spacing) add('spacing', s[side]);
+    add('radii', s.borderRadius);
+    add('shadows', s.boxShadow);
+}
+return {elements: elements.length, rendered: rendered, counts: counts, ms: performance.now() - start};
+"""
+
+
+def ranked(counts):
+    """{value: count} ordered from most to least used"""
+    return dict(Counter(counts).most_common())
+
+
+def extract_style_tokens(driver):
+    """Design tokens with usage counts for the page loaded in driver"""
+    start = time.perf_counter()
+    payload = driver.execute_script(STYLE_SCRIPT)
+    counts = payload["counts"]
+    tokens = {group: ranked(counts.get(group, {})) for group in TOKEN_GROUPS}
+
+    colors = Counter()
+    for group in COLOR_GROUPS:
+        colors.update(counts.get(group, {}))
+
+    return {
+        "colors": list(ranked(colors)),
+        "fonts": list(tokens["fonts"]),
+        "elements": payload["elements"],
+        "rendered": payload["rendered"],
+        "tokens": tokens,
+        "page_ms": round(payload["ms"], 1),
+        "seconds": time.perf_counter() - start,
+    }
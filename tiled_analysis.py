@@ -0,0 +1,346 @@
+"""
+Strip-by-strip analysis of very tall screenshots
+Reads an image as horizontal strips, keeping a fixed-size pixel sample for
+the palette and writing the grayscale, column-reduced rows the layout
+segmentation works on to a temporary file. The XY-cut then runs on that file:
+boxes up to MAX_BOX_ROWS tall are segmented in memory, taller ones from
+line statistics accumulated strip by strip. Resident memory doesn't grow with
+page height. 8-bit non-interlaced PNGs (every capture here) are inflated
+strip by strip and binary PPMs read straight from their pixel buffer; other
+files fall back to a Pillow image that is decoded once
+"""
+
+import io
+import math
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from layout_segmentation import (EDGE_CHANGE, EDGE_COVERAGE, MAX_DEPTH, TARGET_COLUMNS, UNIFORM_TOLERANCE,
+                                 cuts_from_stats, line_stats, min_gap_for, segment)
+from palette import DEFAULT_BACKEND, MAX_SAMPLES, extract_sample_palette
+
+STRIP_HEIGHT = 512
+MAX_BOX_ROWS = 4096    # boxes up to this many rows are read into memory and segmented there
+INFLATE_CHUNK = 256 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}   # by color type
+PNG_KEPT_CHUNKS = (b"PLTE", b"tRNS")            # needed to decode the strips
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+class PNGStrips:
+    """Strips decoded from a PNG's IDAT stream without decoding the whole image
+
+    The zlib stream is inflated as far as the next strip needs. Its still
+    filtered scanlines go to Pillow as a small PNG of their own, after the
+    previous strip's last row stored unfiltered, so Up/Average/Paeth rows
+    resolve exactly. Reading rows before the current position starts over.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(8) != PNG_SIGNATURE:
+                raise ValueError(f"{path} is not a PNG")
+            length, kind = struct.unpack(">I4s", f.read(8))
+            header = f.read(length)
+        if kind != b"IHDR":
+            raise ValueError(f"{path} has no IHDR")
+        self.width, self.height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", header)
+        if depth != 8 or interlace or color_type not in PNG_CHANNELS:
+            raise ValueError(f"{path}: only 8-bit non-interlaced PNGs are read in strips")
+        self.header = header
+        self.stride = self.width * PNG_CHANNELS[color_type]
+        self._restart()
+
+    def _restart(self):
+        self.file = open(self.path, "rb")
+        self.file.seek(8)
+        extra = []
+        while True:
+            length, kind = struct.unpack(">I4s", self.file.read(8))
+            if kind == b"IDAT":
+                break
+            data = self.file.read(length)
+            self.file.read(4)
+            if kind in PNG_KEPT_CHUNKS:
+                extra.append(png_chunk(kind, data))
+        self.extra_chunks = b"".join(extra)
+        self.idat_left = length
+        self.inflater = zlib.decompressobj()
+        self.pending = bytearray()
+        self.row = 0
+        self.previous = None   # last decoded row, unfiltered, in the file's own pixel format
+
+    def _compressed(self):
+        """Next piece of IDAT data, following consecutive IDAT chunks; b"" at the end"""
+        while self.idat_left == 0:
+            self.file.read(4)  # CRC
+            header = self.file.read(8)
+            if len(header) < 8:
+                return b""
+            length, kind = struct.unpack(">I4s", header)
+            if kind != b"IDAT":
+                return b""
+            self.idat_left = length
+        data = self.file.read(min(self.idat_left, INFLATE_CHUNK))
+        self.idat_left -= len(data)
+        return data
+
+    def _scanlines(self, rows):
+        """The next rows filtered scanlines, filter bytes included"""
+        needed = rows * (self.stride + 1)
+        while len(self.pending) < needed:
+            data = self.inflater.unconsumed_tail or self._compressed()
+            if not data:
+                raise ValueError(f"{self.path}: image data ends early")
+            self.pending += self.inflater.decompress(data, INFLATE_CHUNK)
+        lines = bytes(self.pending[:needed])
+        del self.pending[:needed]
+        return lines
+
+    def _decode(self, rows):
+        """Next rows as an (n, width, 3) uint8 array"""
+        lines = self._scanlines(rows)
+        if self.previous is not None:
+            lines = b"\x00" + self.previous + lines
+        total = rows + (self.previous is not None)
+        header = struct.pack(">II", self.width, total) + self.header[8:]
+        strip = Image.open(io.BytesIO(PNG_SIGNATURE + png_chunk(b"IHDR", header) + self.extra_chunks
+                                      + png_chunk(b"IDAT", zlib.compress(lines, 0)) + png_chunk(b"IEND", b"")))
+        strip.load()
+        self.previous = strip.crop((0, total - 1, self.width, total)).tobytes()
+        self.row += rows
+        pixels = np.asarray(strip.convert("RGB"))
+        return pixels[total - rows:]
+
+    def read(self, top, bottom):
+        """Rows [top, bottom) as an (n, width, 3) uint8 array"""
+        if top < self.row:
+            self.file.close()
+            self._restart()
+        while self.row < top:
+            self._decode(min(STRIP_HEIGHT, top - self.row))
+        return self._decode(bottom - top)
+
+    def close(self):
+        self.file.close()
+
+
+class RawStrips:
+    """Strips read straight from the raw pixel buffer of a binary PPM (P6) file
+
+    Each strip is a seek and a read, so nothing but the strip is resident.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(64)
+        fields, offset = [], 0
+        while len(fields) < 4:
+            while header[offset:offset + 1].isspace():
+                offset += 1
+            if header[offset:offset + 1] == b"#":
+                offset = header.index(b"\n", offset)
+                continue
+            end = offset
+            while not header[end:end + 1].isspace():
+                end += 1
+            fields.append(header[offset:end])
+            offset = end
+        if fields[0] != b"P6" or fields[3] != b"255":
+            raise ValueError(f"{path} is not an 8-bit binary PPM")
+        self.width, self.height = int(fields[1]), int(fields[2])
+        self.path = path
+        self.offset = offset + 1
+
+    def read(self, top, bottom):
+        row_bytes = self.width * 3
+        with open(self.path, "rb") as f:
+            f.seek(self.offset + top * row_bytes)
+            data = np.fromfile(f, dtype=np.uint8, count=(bottom - top) * row_bytes)
+        return data.reshape(bottom - top, self.width, 3)
+
+    def close(self):
+        pass  # the file is only open during read()
+
+
+class PillowStrips:
+    """Strips cropped from a Pillow image
+
+    For formats read neither way above; the first crop decodes the whole
+    image, so memory still grows with its height.
+    """
+
+    def __init__(self, path):
+        self.image = Image.open(path)
+        self.width, self.height = self.image.size
+
+    def read(self, top, bottom):
+        """Rows [top, bottom) as an (n, width, 3) uint8 array"""
+        return np.asarray(self.image.crop((0, top, self.width, bottom)).convert("RGB"))
+
+    def close(self):
+        self.image.close()
+
+
+def open_strips(path):
+    """Strip reader for path, streaming when the format allows it"""
+    with open(path, "rb") as f:
+        magic = f.read(8)
+    try:
+        if magic == PNG_SIGNATURE:
+            return PNGStrips(path)
+        if magic[:2] == b"P6":
+            return RawStrips(path)
+    except ValueError:
+        pass
+    return PillowStrips(path)
+
+
+def can_stream(path):
+    """Whether path is read strip by strip in constant memory"""
+    source = open_strips(path)
+    source.close()
+    return not isinstance(source, PillowStrips)
+
+
+def iter_strips(source, strip_height=STRIP_HEIGHT):
+    for top in range(0, source.height, strip_height):
+        bottom = min(top + strip_height, source.height)
+        yield top, source.read(top, bottom)
+
+
+def gray_reduced(strip, factor):
+    """Same grayscale, column-reduced rows as layout_segmentation.grayscale_array"""
+    gray = Image.fromarray(strip).convert("L")
+    if factor > 1:
+        gray = gray.reduce((factor, 1))
+    return np.asarray(gray)
+
+
+class TiledAnalysis:
+    """One pass over the strips of an image, then palette and layout from what it kept
+
+    Holds the image file and the grayscale spill file open until close(),
+    or the end of a with block.
+    """
+
+    def __init__(self, path, strip_height=STRIP_HEIGHT):
+        self.source = open_strips(path)
+        self.width, self.height = self.source.width, self.source.height
+        self.strip_height = strip_height
+        self.x_scale = max(1, self.width // TARGET_COLUMNS)
+        self.sample = None
+        self.gray_file = None
+        self.gray_width = None
+
+    def scan(self):
+        """Read every strip once, keeping the palette sample and the grayscale rows on disk"""
+        if self.sample is not None:
+            return
+        # same sampling density as palette.sample_pixels, continued across strips
+        step = max(1, round(math.sqrt(self.width * self.height / MAX_SAMPLES)))
+        samples = []
+        self.gray_file = tempfile.TemporaryFile()
+        for top, strip in iter_strips(self.source, self.strip_height):
+            first = (-top) % step
+            samples.append(strip[first::step, ::step].reshape(-1, 3))
+            gray = gray_reduced(strip, self.x_scale)
+            self.gray_width = gray.shape[1]
+            self.gray_file.write(gray.tobytes())
+        self.sample = np.concatenate(samples)
+
+    def close(self):
+        self.source.close()
+        if self.gray_file is not None:
+            self.gray_file.close()
+            self.gray_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def gray_rows(self, top, bottom):
+        """Grayscale rows [top, bottom), as layout_segmentation.grayscale_array has them"""
+        self.gray_file.seek(top * self.gray_width)
+        data = np.fromfile(self.gray_file, dtype=np.uint8, count=(bottom - top) * self.gray_width)
+        return data.reshape(bottom - top, self.gray_width)
+
+    def palette(self, n_colors=10, backend=DEFAULT_BACKEND):
+        """Hex colors from the strip-wise pixel sample, with any palette backend"""
+        self.scan()
+        return extract_sample_palette(self.sample, n_colors, backend)
+
+    def box_stats(self, top, bottom, left, right, direction):
+        """layout_segmentation.line_stats for a box, accumulated strip by strip"""
+        if direction == "rows":
+            uniform = np.zeros(bottom - top, dtype=bool)
+            edges = np.zeros(bottom - top, dtype=bool)
+            previous = None
+            for start in range(top, bottom, self.strip_height):
+                end = min(start + self.strip_height, bottom)
+                lines = self.gray_rows(start, end)[:, left:right]
+                uniform[start - top:end - top], edges[start - top:end - top] = line_stats(lines, previous)
+                previous = lines[-1]
+            return uniform, edges
+
+        highest = np.zeros(right - left, dtype=np.uint8)
+        lowest = np.full(right - left, 255, dtype=np.uint8)
+        changed = np.zeros(right - left - 1, dtype=np.int64)
+        for start in range(top, bottom, self.strip_height):
+            lines = self.gray_rows(start, min(start + self.strip_height, bottom))[:, left:right]
+            highest = np.maximum(highest, lines.max(axis=0))
+            lowest = np.minimum(lowest, lines.min(axis=0))
+            changed += (np.abs(np.diff(lines.astype(np.int16), axis=1)) > EDGE_CHANGE).sum(axis=0)
+        uniform = (highest - lowest) <= UNIFORM_TOLERANCE
+        edges = np.concatenate(([False], changed / (bottom - top) >= EDGE_COVERAGE))
+        return uniform, edges
+
+    def layout_tree(self, max_depth=MAX_DEPTH):
+        """Same box tree as layout_segmentation.segment_image"""
+        self.scan()
+        tree = self._node(0, self.height, 0, self.gray_width, "rows", 0, max_depth)
+        tree["right"] = self.width
+        return tree
+
+    def _node(self, top, bottom, left, right, axis, depth, max_depth):
+        """segment()'s recursion, without holding boxes taller than MAX_BOX_ROWS"""
+        if bottom - top <= MAX_BOX_ROWS:
+            gray = self.gray_rows(top, bottom)[:, left:right]
+            return segment(gray, self.x_scale, max_depth - depth, axis, y_offset=top, x_offset=left)
+        box = {
+            "top": top,
+            "bottom": bottom,
+            "left": left * self.x_scale,
+            "right": right * self.x_scale,
+            "height": bottom - top,
+            "children": [],
+        }
+        if depth >= max_depth:
+            return box
+        for direction in (axis, "columns" if axis == "rows" else "rows"):
+            uniform, edges = self.box_stats(top, bottom, left, right, direction)
+            cuts = cuts_from_stats(uniform, edges, min_gap_for(direction, self.x_scale))
+            if cuts:
+                following = "columns" if direction == "rows" else "rows"
+                start = top if direction == "rows" else left
+                bounds = [start + cut for cut in [0] + cuts] + [bottom if direction == "rows" else right]
+                for first, last in zip(bounds, bounds[1:]):
+                    if direction == "rows":
+                        box["children"].append(self._node(first, last, left, right, following, depth + 1, max_depth))
+                    else:
+                        box["children"].append(self._node(top, bottom, first, last, following, depth + 1, max_depth))
+                box["split"] = direction
+                break
+        return box